@@ -1,7 +1,19 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.widgets import AutocompleteSelect
 from django.contrib.auth.models import Group
-from django.utils.safestring import mark_safe
-
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+from core.filters import AutocompleteFilter, AutocompleteFilterMixin
+from core.mixins import (
+    BulkDeleteAdminMixin, IndexedSearchAdminMixin, LimitedCountAdminMixin
+)
+from core.services import (
+    delete_comments, delete_posts, move_posts, publish_categories,
+    publish_posts
+)
 from .models import Category, Comment, Location, Post
 
 admin.site.empty_value_display = 'Не задано'
@@ -19,6 +31,15 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description', 'slug')
     ordering = ('-created_at',)
     list_display_links = ('title',)
+    actions = ('publish', 'unpublish')
+
+    @admin.action(description='Опубликовать выбранные категории')
+    def publish(self, request, queryset):
+        publish_categories(queryset, True)
+
+    @admin.action(description='Снять с публикации выбранные категории')
+    def unpublish(self, request, queryset):
+        publish_categories(queryset, False)
 
 
 @admin.register(Location)
@@ -32,35 +53,109 @@ class LocationAdmin(admin.ModelAdmin):
     list_display_links = ('name',)
 
 
+class PostActionForm(ActionForm):
+    """Форма действий с публикациями: категория для переноса."""
+
+    category = forms.ModelChoiceField(
+        Category.objects.all(),
+        required=False,
+        label='Категория',
+        widget=AutocompleteSelect(
+            Post._meta.get_field('category'), admin.site,
+            attrs={'data-width': '15em'},
+        ),
+    )
+
+
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(AutocompleteFilterMixin, BulkDeleteAdminMixin,
+                IndexedSearchAdminMixin, LimitedCountAdminMixin,
+                admin.ModelAdmin):
     """Настройка раздела Публикации."""
 
     list_display = ('is_published', 'title', 'text', 'image_tag', 'author',
                     'location', 'category', 'pub_date', 'created_at')
-    list_filter = ('is_published', 'author', 'location', 'category')
+    list_select_related = ('author', 'location', 'category')
+    list_filter = (
+        'is_published',
+        ('author', AutocompleteFilter),
+        ('location', AutocompleteFilter),
+        ('category', AutocompleteFilter),
+    )
     search_fields = ('title', 'text')
     ordering = ('-created_at',)
     list_display_links = ('title',)
     readonly_fields = ('image_tag',)
+    autocomplete_fields = ('author', 'location', 'category')
+    actions = ('publish', 'unpublish', 'move_to_category')
+    action_form = PostActionForm
 
     def image_tag(self, obj):
-        """Добавляет изображение в разделе Публикации и в самом посте."""
-        if obj.image:
-            return mark_safe(
-                f'<img src={obj.image.url} width="80" height="60">'
+        """
+        Добавляет изображение в разделе Публикации и в самом посте:
+        выводится самая маленькая копия, а не оригинал.
+        """
+        if not obj.image:
+            return 'Нет изображения'
+        thumbnail = obj.image_thumbnail
+        if thumbnail is None:
+            return format_html(
+                '<img src="{}" width="80" height="60">', obj.image.url
             )
-        return 'Нет изображения'
+        return format_html(
+            '<img src="{}" width="80" height="{}" loading="lazy">',
+            default_storage.url(thumbnail['fallback']),
+            round(80 * thumbnail['height'] / thumbnail['width']),
+        )
 
     image_tag.short_description = 'Изображение'
 
+    @admin.action(description='Опубликовать выбранные публикации')
+    def publish(self, request, queryset):
+        publish_posts(queryset, True)
+
+    @admin.action(description='Снять с публикации выбранные публикации')
+    def unpublish(self, request, queryset):
+        publish_posts(queryset, False)
+
+    @admin.action(description='Перенести выбранные публикации в категорию')
+    def move_to_category(self, request, queryset):
+        form = self.action_form(request.POST)
+        form.is_valid()
+        category = form.cleaned_data.get('category')
+        if category is None:
+            self.message_user(
+                request, 'Выберите категорию для переноса', messages.ERROR
+            )
+            return
+        move_posts(queryset, category)
+
+    def delete_objects(self, queryset):
+        """
+        Удаляет выбранные публикации групповыми DELETE вместо удаления
+        каждой с её комментариями по отдельности.
+        """
+        delete_posts(queryset)
+
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(AutocompleteFilterMixin, BulkDeleteAdminMixin,
+                   IndexedSearchAdminMixin, LimitedCountAdminMixin,
+                   admin.ModelAdmin):
     """Настройка раздела Комментарии."""
 
     list_display = ('text', 'author', 'created_at')
-    list_filter = ('text', 'author')
-    search_fields = ('text', 'author')
+    list_select_related = ('author',)
+    list_filter = (
+        'created_at',
+        ('post', AutocompleteFilter),
+        ('author', AutocompleteFilter),
+    )
+    search_fields = ('text', 'author__username')
     ordering = ('-created_at',)
     list_display_links = ('text',)
+    autocomplete_fields = ('post', 'author')
+
+    def delete_objects(self, queryset):
+        """Удаляет выбранные комментарии одним DELETE."""
+        delete_comments(queryset)
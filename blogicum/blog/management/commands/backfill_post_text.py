@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from core.text import fill_rendered_text
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает анонсы и HTML текста публикаций пакетами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = fill_rendered_text(
+            Post.objects.all(), batch_size=options['batch_size']
+        )
+        self.stdout.write(f'Обработано публикаций: {total}')
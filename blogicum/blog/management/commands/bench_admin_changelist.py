@@ -0,0 +1,83 @@
+from datetime import timedelta
+from statistics import median
+
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+
+from blog.models import Comment
+from core.bench import measure, rollback_after, seed_comments
+
+SCENARIOS = (
+    ('последние', {}),
+    ('страница 100', {'p': 99}),
+    ('за неделю', {'created_at__gte': 7}),
+    ('частое слово', {'q': 'скворцов'}),
+    ('редкое слово', {'q': 'редкость'}),
+    ('префикс автора', {'q': '@bench_user_00'}),
+    ('автор и слово', {'q': '@bench_user_001 грачей'}),
+)
+
+
+class Command(BaseCommand):
+    help = ('Измеряет время списка комментариев в админке с поиском и '
+            'фильтрами на большой таблице. Только для SQLite. Бюджет '
+            'проверяется по времени запросов: отрисовка ста строк от '
+            'размера таблицы не зависит.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=10_000_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--budget', type=float, default=200,
+            help='Допустимое время запросов одного списка, мс.',
+        )
+
+    def handle(self, *args, **options):
+        with rollback_after():
+            seed_comments(options['comments'], stdout=self.stdout)
+            self.report(options['repeat'], options['budget'])
+
+    def report(self, repeat, budget):
+        admin = site._registry[Comment]
+        user = User.objects.create_superuser('bench_admin')
+        week_ago = (now() - timedelta(days=7)).isoformat()
+        self.stdout.write(
+            f'{"список":<18}{"запросов":>10}{"SQL, мс":>10}{"всего, мс":>12}'
+        )
+        over_budget = []
+        for name, params in SCENARIOS:
+            if 'created_at__gte' in params:
+                params = {'created_at__gte': week_ago}
+            request = RequestFactory().get('/admin/blog/comment/', params)
+            request.user = user
+            queries = []
+
+            def changelist():
+                with CaptureQueriesContext(connection) as captured:
+                    admin.changelist_view(request).render()
+                queries.append(captured.captured_queries)
+
+            elapsed = measure(changelist, repeat)
+            sql_time = median(
+                sum(float(query['time']) for query in run) * 1000
+                for run in queries
+            )
+            self.stdout.write(
+                f'{name:<18}{len(queries[0]):>10}{sql_time:>10.2f}'
+                f'{elapsed:>12.2f}'
+            )
+            if sql_time > budget:
+                over_budget.append(name)
+        if over_budget:
+            self.stdout.write(self.style.ERROR(
+                f'Запросы дольше {budget:g} мс: {", ".join(over_budget)}'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Запросы всех списков быстрее {budget:g} мс'
+            ))
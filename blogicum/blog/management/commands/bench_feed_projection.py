@@ -0,0 +1,55 @@
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from core.bench import measure, rollback_after, seed_posts
+from core.services import (
+    filter_publication, project_post_cards, select_related_posts
+)
+
+PAGE_SIZES = (10, 50, 100)
+
+
+def peak_memory(func):
+    """Пиковый объём памяти Python при выполнении `func`, в КиБ."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время и память выборки страницы ленты со всеми '
+            'колонками и с проекцией карточки поста.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument('--text-size', type=int, default=8 * 1024)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rollback_after():
+            seed_posts(options['posts'], text_size=options['text_size'])
+            self.report(options['repeat'])
+
+    def report(self, repeat):
+        feed = filter_publication(Post.objects.all())
+        variants = (
+            ('все колонки', select_related_posts(feed)),
+            ('проекция', project_post_cards(feed)),
+        )
+        self.stdout.write(
+            f'{"вариант":<14}{"размер":>8}{"мс":>10}{"КиБ":>10}'
+        )
+        for page_size in PAGE_SIZES:
+            for name, queryset in variants:
+                def fetch():
+                    return list(queryset[:page_size])
+                self.stdout.write(
+                    f'{name:<14}{page_size:>8}'
+                    f'{measure(fetch, repeat):>10.2f}'
+                    f'{peak_memory(fetch):>10.0f}'
+                )
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+
+from blog.models import Post
+from core.bench import measure, rollback_after, seed_posts
+from core.consts import PAGINATOR_VALUE
+from core.paginators import KeysetPaginator, encode_cursor
+from core.services import filter_publication, select_related_posts
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время первой и глубокой страницы ленты в '
+            'нумерованном и курсорном режимах пагинации.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--page', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rollback_after():
+            seed_posts(options['posts'], stdout=self.stdout)
+            self.report(options['page'], options['repeat'])
+
+    def report(self, page_number, repeat):
+        queryset = select_related_posts(
+            filter_publication(Post.objects.all())
+        )
+        keyset = KeysetPaginator(queryset, PAGINATOR_VALUE)
+        last_before_page = queryset.order_by(*keyset.ordering)[
+            (page_number - 1) * PAGINATOR_VALUE - 1
+        ]
+        cursor = encode_cursor(last_before_page)
+        rows = (
+            ('numbered', 1,
+             lambda: list(Paginator(queryset, PAGINATOR_VALUE).page(1))),
+            ('numbered', page_number,
+             lambda: list(
+                 Paginator(queryset, PAGINATOR_VALUE).page(page_number)
+             )),
+            ('keyset', 1, lambda: list(keyset.page())),
+            ('keyset', page_number, lambda: list(keyset.page(after=cursor))),
+        )
+        self.stdout.write(f'{"режим":<10}{"страница":>10}{"мс":>12}')
+        for mode, number, func in rows:
+            self.stdout.write(
+                f'{mode:<10}{number:>10}{measure(func, repeat):>12.2f}'
+            )
@@ -0,0 +1,92 @@
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from statistics import quantiles
+from tempfile import TemporaryDirectory
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+from core.bench import mixed_load, seed_posts
+
+# Настройки SQLite по умолчанию: журнал отката и synchronous=FULL.
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+def p95(timings):
+    return quantiles(timings, n=20)[-1] if len(timings) > 1 else 0
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает смешанную нагрузку из нескольких процессов - '
+            'чтение главной ленты и добавление комментариев - на копии '
+            'базы с настройками SQLite по умолчанию и с SQLITE_PRAGMAS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument(
+            '--write-share', type=float, default=0.1,
+            help='Доля записей среди операций.',
+        )
+
+    def handle(self, *args, **options):
+        profiles = (
+            ('по умолчанию', DEFAULT_PRAGMAS),
+            ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS),
+        )
+        with TemporaryDirectory() as directory:
+            template = os.path.join(directory, 'template.sqlite3')
+            post_ids, author_id = self.prepare(template, options['posts'])
+            self.stdout.write(
+                f'{"профиль":<16}{"чтений/с":>10}{"записей/с":>11}'
+                f'{"p95 чтения":>12}{"p95 записи":>12}{"блокировок":>12}'
+            )
+            for number, (name, pragmas) in enumerate(profiles):
+                path = os.path.join(directory, f'run{number}.sqlite3')
+                shutil.copy(template, path)
+                results = self.run(path, pragmas, post_ids, author_id,
+                                   options)
+                self.report(name, results, options['seconds'])
+
+    def prepare(self, template, posts):
+        """Копия базы с `posts` опубликованными постами для нагрузки."""
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM INTO %s', [template])
+        connection.close()
+        connection.settings_dict['NAME'] = template
+        author, category = seed_posts(posts, stdout=self.stdout)
+        post_ids = list(author.posts.values_list('pk', flat=True))
+        connection.close()
+        return post_ids, author.pk
+
+    def run(self, path, pragmas, post_ids, author_id, options):
+        workers = options['workers']
+        # Дочерние процессы не должны наследовать открытые соединения.
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=django.setup
+        ) as pool:
+            return list(pool.map(
+                mixed_load,
+                repeat(path, workers),
+                repeat(pragmas, workers),
+                repeat(options['seconds'], workers),
+                repeat(options['write_share'], workers),
+                repeat(post_ids, workers),
+                repeat(author_id, workers),
+            ))
+
+    def report(self, name, results, seconds):
+        reads = [timing for result in results for timing in result[0]]
+        writes = [timing for result in results for timing in result[1]]
+        locked = sum(result[2] for result in results)
+        self.stdout.write(
+            f'{name:<16}{len(reads) / seconds:>10.0f}'
+            f'{len(writes) / seconds:>11.0f}{p95(reads):>12.2f}'
+            f'{p95(writes):>12.2f}{locked:>12}'
+        )
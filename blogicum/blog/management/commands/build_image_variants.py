@@ -0,0 +1,64 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils.timezone import now
+
+from blog.models import Post
+from core.cache import invalidate_all_feeds
+from core.images import build_variants, delete_variants
+
+
+class Command(BaseCommand):
+    help = ('Создаёт уменьшенные копии и WebP-версии изображений '
+            'публикаций в пуле процессов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов обработки изображений.'
+        )
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать копии и для уже обработанных изображений.'
+        )
+
+    def handle(self, *args, **options):
+        pending = [
+            (pk, name, variants)
+            for pk, name, variants in Post.objects.exclude(
+                image=''
+            ).values_list('pk', 'image', 'image_variants').iterator()
+            if options['force'] or variants.get('source') != name
+        ]
+        # Дочерние процессы не должны наследовать открытые соединения.
+        connections.close_all()
+        batch_size = options['batch_size']
+        with ProcessPoolExecutor(
+            max_workers=options['workers'], initializer=django.setup
+        ) as pool:
+            for offset in range(0, len(pending), batch_size):
+                batch = pending[offset:offset + batch_size]
+                results = pool.map(
+                    build_variants, [name for _, name, _ in batch]
+                )
+                posts = []
+                for (pk, _, previous), variants in zip(batch, results):
+                    delete_variants(previous)
+                    posts.append(Post(
+                        pk=pk, image_variants=variants, updated_at=now()
+                    ))
+                Post.objects.bulk_update(
+                    posts, ('image_variants', 'updated_at')
+                )
+                self.stdout.write(
+                    f'\rОбработано {offset + len(batch)} из {len(pending)}',
+                    ending='',
+                )
+        self.stdout.write('')
+        if pending:
+            invalidate_all_feeds()
+        self.stdout.write(f'Обработано изображений: {len(pending)}')
@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from blog.models import Post
+from core.models import StoredFile
+
+
+class Command(BaseCommand):
+    help = ('Удаляет файлы изображений публикаций, на которые больше нет '
+            'ссылок: после удаления поста или замены изображения.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=float, default=24,
+            help='Не трогать файлы, ссылку на которые сняли позже.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только вывести файлы, которые будут удалены.'
+        )
+
+    def handle(self, *args, **options):
+        storage = Post._meta.get_field('image').storage
+        cutoff = now() - timedelta(hours=options['grace_hours'])
+        collected = 0
+        for stored in StoredFile.objects.filter(
+            references=0, released_at__lt=cutoff
+        ).iterator():
+            if options['dry_run']:
+                self.stdout.write(stored.name)
+                collected += 1
+                continue
+            # Условное удаление: ссылку могли вернуть после выборки.
+            # Файл удаляется до фиксации, пока запись заблокирована:
+            # загрузка того же файла ждёт блокировку в retain_file() и
+            # после неё видит, что файла нет.
+            with transaction.atomic():
+                deleted, _ = StoredFile.objects.filter(
+                    pk=stored.pk, references=0
+                ).delete()
+                if deleted:
+                    storage.delete(stored.name)
+                    collected += 1
+        self.stdout.write(f'Удалено файлов: {collected}')
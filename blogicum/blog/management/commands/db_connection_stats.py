@@ -0,0 +1,34 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from core.db import connection_opens
+
+
+class Command(BaseCommand):
+    help = ('Выводит число открытых соединений с базой по минутам во всех '
+            'процессах сервера. Нужен общий бэкенд кэша.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutes', type=int, default=None,
+            help='За сколько последних минут, по умолчанию '
+                 'DB_CONNECTION_STATS_MINUTES.',
+        )
+
+    def handle(self, *args, **options):
+        if isinstance(caches['default'], (LocMemCache, DummyCache)):
+            raise CommandError(
+                'Счётчики соединений хранятся в кэше процесса сервера: '
+                'настройте общий бэкенд кэша (Memcached, Redis).'
+            )
+        opens = connection_opens(options['minutes'])
+        for minute, count in opens:
+            if count:
+                self.stdout.write(f'{minute}  {count}')
+        total = sum(count for minute, count in opens)
+        self.stdout.write(
+            f'Открыто соединений: {total}, в среднем за минуту: '
+            f'{total / len(opens):.1f}'
+        )
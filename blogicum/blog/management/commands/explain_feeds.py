@@ -0,0 +1,80 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from blog.models import Post
+from core.bench import rollback_after, seed_posts
+from core.services import filter_publication
+
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+def is_problem(detail, sorts):
+    """
+    Проблемный шаг плана: временное B-дерево или сканирование таблицы.
+    Обход индекса (SCAN ... USING INDEX) отмечается, только если запрос
+    всё равно сортирует строки, то есть порядок индекса не используется.
+    """
+    if detail.startswith(TEMP_SORT):
+        return True
+    if not detail.startswith('SCAN'):
+        return False
+    return sorts or 'USING' not in detail
+
+
+class Command(BaseCommand):
+    help = ('Выводит EXPLAIN QUERY PLAN запросов страниц лент и поста и '
+            'отмечает сканирования таблиц и временные B-деревья.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Создать столько тестовых постов на время отчёта.'
+        )
+
+    def handle(self, *args, **options):
+        with rollback_after():
+            if options['seed']:
+                seed_posts(options['seed'])
+            post = filter_publication(Post.objects.all()).select_related(
+                'author', 'category'
+            ).first()
+            if post is None:
+                self.stderr.write('Нет опубликованных постов для отчёта.')
+                return
+            problems = 0
+            for url in (
+                reverse('blog:index'),
+                reverse('blog:category_posts', args=(post.category.slug,)),
+                reverse('blog:profile', args=(post.author.username,)),
+                reverse('blog:post_detail', args=(post.id,)),
+            ):
+                problems += self.explain_url(url)
+        self.stdout.write(f'Проблемных шагов плана: {problems}')
+
+    def explain_url(self, url):
+        request = RequestFactory().get(url)
+        request.user = AnonymousUser()
+        with CaptureQueriesContext(connection) as queries:
+            match = resolve(url)
+            match.func(request, *match.args, **match.kwargs).render()
+        self.stdout.write(self.style.MIGRATE_HEADING(url))
+        problems = 0
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT') or 'blog_' not in sql:
+                continue
+            self.stdout.write(f'  {sql[:120]}...')
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                details = [detail for *_, detail in cursor.fetchall()]
+                sorts = any(detail.startswith(TEMP_SORT) for detail in details)
+                for detail in details:
+                    bad = is_problem(detail, sorts)
+                    problems += bad
+                    style = self.style.WARNING if bad else str
+                    self.stdout.write(style(f'    {detail}'))
+        return problems
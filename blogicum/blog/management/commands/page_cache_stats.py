@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.cache import page_cache_stats
+
+
+class Command(BaseCommand):
+    help = ('Выводит число попаданий и промахов кэша страниц. Для общего '
+            'бэкенда кэша показывает статистику всех процессов сервера.')
+
+    def handle(self, *args, **options):
+        hits, misses, ratio = page_cache_stats()
+        self.stdout.write(
+            f'Попаданий: {hits}, промахов: {misses}, доля попаданий: '
+            f'{ratio:.1%}'
+        )
@@ -0,0 +1,35 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from core.scheduling import next_publication
+
+MAX_SLEEP = 60
+
+
+class Command(BaseCommand):
+    help = ('Публикует отложенные посты в момент наступления их даты: '
+            'сдвигает горизонт публикации и сбрасывает кэши лент. '
+            'Нужен общий для процессов сервера бэкенд кэша.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать наступившие публикации и выйти (для cron).'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            upcoming = next_publication()
+            if options['once']:
+                return
+            delay = MAX_SLEEP
+            if upcoming is not None:
+                delay = min(
+                    max((upcoming - now()).total_seconds(), 0), MAX_SLEEP
+                )
+            self.stdout.write(
+                f'Следующая публикация: {upcoming or "нет"}'
+            )
+            sleep(delay)
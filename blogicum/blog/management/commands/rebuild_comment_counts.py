@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+from core.services import recount_comments
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев публикаций пакетами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = Post.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        updated = 0
+        for start in range(0, last_id, batch_size):
+            with transaction.atomic():
+                updated += recount_comments(Post.objects.filter(
+                    pk__gt=start, pk__lte=start + batch_size
+                ))
+        self.stdout.write(f'Пересчитано публикаций: {updated}')
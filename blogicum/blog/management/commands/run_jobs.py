@@ -0,0 +1,45 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import sleep
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.jobs import requeue_stale_jobs, run_jobs
+
+
+class Command(BaseCommand):
+    help = ('Обрабатывает очередь фоновых задач (копии изображений '
+            'публикаций) в пуле процессов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов обработки.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать ожидающие задачи и выйти (для cron и тестов).'
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        requeue_stale_jobs()
+        # Дочерние процессы не должны наследовать открытые соединения.
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=django.setup
+        ) as pool:
+            while True:
+                done = run_jobs(pool, limit=workers * 2)
+                if done:
+                    self.stdout.write(f'Выполнено задач: {done}')
+                elif options['once']:
+                    return
+                else:
+                    sleep(options['poll_interval'])
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.images import trim_resize_cache
+
+
+class Command(BaseCommand):
+    help = ('Удаляет давно не запрашивавшиеся уменьшенные версии '
+            'изображений, пока кэш больше IMAGE_RESIZE_CACHE_MAX_BYTES.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-bytes', type=int,
+            help='Предельный размер кэша вместо настройки.'
+        )
+
+    def handle(self, *args, **options):
+        removed = trim_resize_cache(options['max_bytes'])
+        self.stdout.write(f'Удалено файлов: {removed}')
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:21
+
+from django.db import migrations, models
+
+from core.text import fill_rendered_text
+
+
+def fill_post_text(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    fill_rendered_text(Post.objects.all(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(default='', editable=False, max_length=256, verbose_name='Анонс'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(default='', editable=False, verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(fill_post_text, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_updated_at_tracking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_variants',
+            field=models.JSONField(default=dict, editable=False, help_text='Уменьшенные копии изображения и их размеры.', verbose_name='Копии изображения'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:36
+
+import core.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_references(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    StoredFile = apps.get_model('core', 'StoredFile')
+    StoredFile.objects.bulk_create(
+        StoredFile(name=row['image'], references=row['total'])
+        for row in Post.objects.exclude(image='').values('image').annotate(
+            total=Count('pk')
+        ).order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_image_variants'),
+        ('core', '0002_storedfile'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=core.storage.post_image_storage, upload_to='posts_images', verbose_name='Фото'),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
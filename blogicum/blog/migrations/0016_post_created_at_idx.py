@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_comment_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['created_at'], name='post_created_at_idx'),
+        ),
+    ]
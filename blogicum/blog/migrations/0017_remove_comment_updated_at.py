@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:35
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_created_at_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='comment',
+            name='updated_at',
+        ),
+    ]
@@ -0,0 +1,72 @@
+from django.db import migrations
+
+# Схемы индексов на момент этой миграции: core.search может меняться
+# дальше. Столбцы до и после добавления author_id.
+PREVIOUS_COLUMNS = {
+    'blog_post': ('title', 'text'),
+    'blog_comment': ('text',),
+}
+COLUMNS = {
+    'blog_post': ('author_id', 'title', 'text'),
+    'blog_comment': ('author_id', 'text'),
+}
+
+
+def search_schema(table, columns):
+    fts = f'{table}_fts'
+    names = ', '.join(columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    return (
+        f"""CREATE VIRTUAL TABLE {fts} USING fts5(
+            {names}, content='{table}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )""",
+        f"""CREATE TRIGGER {fts}_insert
+        AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});
+        END""",
+        f"""CREATE TRIGGER {fts}_delete
+        AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {names})
+            VALUES ('delete', old.id, {old});
+        END""",
+        f"""CREATE TRIGGER {fts}_update
+        AFTER UPDATE OF {names} ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {names})
+            VALUES ('delete', old.id, {old});
+            INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});
+        END""",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    )
+
+
+def reinstall(schema_editor, indexes):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, columns in indexes.items():
+        fts = f'{table}_fts'
+        for action in ('insert', 'delete', 'update'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {fts}_{action}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {fts}')
+        for statement in search_schema(table, columns):
+            schema_editor.execute(statement)
+
+
+def add_author(apps, schema_editor):
+    reinstall(schema_editor, COLUMNS)
+
+
+def remove_author(apps, schema_editor):
+    reinstall(schema_editor, PREVIOUS_COLUMNS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_remove_comment_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_author, remove_author),
+    ]
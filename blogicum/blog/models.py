@@ -1,11 +1,18 @@
 from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
 from django.db import models
+from django.utils.timezone import now
 
 from core.consts import MAX_LENGTH, SLICE
-from core.models import CreatedModel, PublishedCreatedModel, TitleModel
+from core.models import (
+    CreatedModel, PublishedCreatedModel, TitleModel, UpdatedModel
+)
+from core.images import srcset
+from core.storage import post_image_storage
+from core.text import make_excerpt, render_text
 
 
-class Category(TitleModel, PublishedCreatedModel):
+class Category(TitleModel, PublishedCreatedModel, UpdatedModel):
     """Модель таблицы Категория."""
 
     description = models.TextField('Описание')
@@ -40,7 +47,7 @@ class Location(PublishedCreatedModel):
         return self.name[:SLICE]
 
 
-class Post(TitleModel, PublishedCreatedModel):
+class Post(TitleModel, PublishedCreatedModel, UpdatedModel):
     """Модель таблицы Публикация."""
 
     text = models.TextField('Текст')
@@ -70,18 +77,139 @@ class Post(TitleModel, PublishedCreatedModel):
     image = models.ImageField(
         'Фото',
         upload_to='posts_images',
+        storage=post_image_storage,
         blank=True,
     )
+    excerpt = models.CharField(
+        'Анонс',
+        max_length=MAX_LENGTH,
+        default='',
+        editable=False,
+    )
+    text_html = models.TextField(
+        'Текст в HTML',
+        default='',
+        editable=False,
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    image_variants = models.JSONField(
+        'Копии изображения',
+        default=dict,
+        editable=False,
+        help_text='Уменьшенные копии изображения и их размеры.',
+    )
+    is_visible = models.BooleanField(
+        'Виден в лентах',
+        default=False,
+        editable=False,
+        help_text='Пост опубликован, его категория опубликована и дата '
+        'публикации наступила.',
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
         default_related_name = 'posts'
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_visible=True),
+                name='post_visible_pub_date_idx',
+            ),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_visible=False, is_published=True),
+                name='post_scheduled_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=('created_at',),
+                name='post_created_at_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title[:SLICE]
 
+    def save(self, *args, update_fields=None, **kwargs):
+        self.excerpt = make_excerpt(self.text)
+        self.text_html = render_text(self.text)
+        self.is_visible = (
+            self.is_published
+            and self.category is not None
+            and self.category.is_published
+            and self.pub_date <= now()
+        )
+        # Копии прежнего изображения удаляет сигнал, новые создаёт
+        # фоновая задача.
+        self._stale_variants = None
+        if (self.image.name or '') != self.image_variants.get('source', ''):
+            self._stale_variants = self.image_variants
+            self.image_variants = {}
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'text' in update_fields:
+                update_fields |= {'excerpt', 'text_html'}
+            if update_fields & {'is_published', 'category', 'pub_date'}:
+                update_fields.add('is_visible')
+            if 'image' in update_fields:
+                update_fields.add('image_variants')
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    @property
+    def card_revision(self):
+        """
+        Маркер версии карточки поста для кэша фрагментов: меняется при
+        правке поста, его категории, местоположения и числа комментариев.
+        """
+        parts = [self.updated_at.timestamp(), self.comment_count,
+                 self.author.username]
+        if self.category:
+            parts += [self.category.slug, self.category.title,
+                      self.category.is_published]
+        if self.location:
+            parts += [self.location.name, self.location.is_published]
+        return ':'.join(map(str, parts))
+
+    @property
+    def image_srcsets(self):
+        """Атрибуты srcset уменьшенных копий: WebP и запасной формат."""
+        return {
+            'webp': srcset(self.image_variants, 'webp'),
+            'fallback': srcset(self.image_variants, 'fallback'),
+        }
+
+    @property
+    def image_ready(self):
+        """Копии изображения созданы и его можно выводить."""
+        return bool(self.image_variants.get('source'))
+
+    @property
+    def image_src(self):
+        """Адрес самой большой копии изображения или оригинала."""
+        sizes = self.image_variants.get('sizes')
+        if sizes:
+            return default_storage.url(sizes[-1]['fallback'])
+        return self.image.url
+
+    @property
+    def image_thumbnail(self):
+        """Самая маленькая копия изображения или None."""
+        sizes = self.image_variants.get('sizes')
+        return sizes[0] if sizes else None
+
 
 class Comment(CreatedModel):
     """Модель таблицы Комментарий."""
@@ -102,6 +230,20 @@ class Comment(CreatedModel):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx',
+            ),
+            models.Index(
+                fields=('created_at',),
+                name='comment_created_at_idx',
+            ),
+            models.Index(
+                fields=('author', 'created_at'),
+                name='comment_author_created_at_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:SLICE]
@@ -0,0 +1,235 @@
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_migrate, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from core.cache import (
+    FEED_FIELDS, invalidate_category_feeds, invalidate_lookups,
+    invalidate_pages, invalidate_post_feeds, post_page_tags
+)
+from core.images import delete_variants
+from core.jobs import IMAGE_VARIANTS, enqueue
+from core.scheduling import refresh_visibility, schedule_publication
+from core.search import SEARCH_INDEXES, install_search
+from core.storage import release_file, retain_file
+from .models import Category, Comment, Location, Post
+
+
+def modification_time(instance, signal):
+    """
+    Время изменения для ревизий страниц: updated_at сохранённой записи.
+    У комментариев поля нет, для них берётся текущее время.
+    """
+    if signal is not post_save:
+        return None
+    return getattr(instance, 'updated_at', None)
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, raw, **kwargs):
+    """Увеличивает счётчик комментариев поста при добавлении комментария."""
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """
+    Уменьшает счётчик при удалении комментария, в том числе каскадном
+    и через панель администратора.
+    """
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, created=False, **kwargs):
+    """
+    Правка комментария меняет только страницу поста, а добавление и
+    удаление - ещё и счётчик в карточках лент.
+    """
+    modified_at = modification_time(instance, kwargs['signal'])
+    if kwargs['signal'] is post_save and not created:
+        invalidate_pages({f'post:{instance.post_id}'}, modified_at)
+        return
+    invalidate_pages(post_page_tags(
+        Post.objects.filter(pk=instance.post_id).values(*FEED_FIELDS)
+    ), modified_at)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_feeds(sender, instance, **kwargs):
+    """
+    Запоминает ленты, в которые пост входил, и его изображение, а также
+    будет ли новое изображение загружено в хранилище при сохранении.
+    """
+    instance._previous_feeds = list(
+        Post.objects.filter(pk=instance.pk).values(*FEED_FIELDS, 'image')
+    ) if instance.pk else []
+    instance._previous_image = next(
+        (row['image'] for row in instance._previous_feeds), ''
+    )
+    instance._uploading_image = bool(
+        instance.image and not instance.image._committed
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    """Сбрасывает ленты, в которые пост входил или вошёл."""
+    rows = list(getattr(instance, '_previous_feeds', []))
+    if kwargs['signal'] is post_save:
+        rows += Post.objects.filter(pk=instance.pk).values(*FEED_FIELDS)
+        schedule_publication(instance.pub_date)
+    invalidate_post_feeds(
+        rows, modification_time(instance, kwargs['signal'])
+    )
+
+
+@receiver(post_save, sender=Post)
+def enqueue_image_variants(sender, instance, raw, **kwargs):
+    """
+    Удаляет копии прежнего изображения и ставит в очередь создание
+    копий нового: запрос не ждёт обработки изображения.
+    """
+    if raw or getattr(instance, '_stale_variants', None) is None:
+        return
+    delete_variants(instance._stale_variants)
+    if instance.image:
+        enqueue(IMAGE_VARIANTS, instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def count_image_references(sender, instance, **kwargs):
+    """
+    Ведёт счётчики ссылок на файлы изображений: удалённый пост и
+    заменённое изображение снимают ссылку, файл без ссылок удалит
+    команда collect_images. Копии удалённого поста удаляются сразу.
+    Ссылку на загруженный файл уже взяло хранилище.
+    """
+    current = instance.image.name or ''
+    if kwargs['signal'] is post_delete:
+        if current:
+            release_file(current)
+        transaction.on_commit(
+            partial(delete_variants, instance.image_variants)
+        )
+        return
+    previous = getattr(instance, '_previous_image', '')
+    uploading = getattr(instance, '_uploading_image', False)
+    if previous == current:
+        if current and uploading:
+            # Повторная загрузка того же файла: хранилище взяло лишнюю
+            # ссылку.
+            release_file(current)
+        return
+    if previous:
+        release_file(previous)
+    if current and not uploading:
+        retain_file(current)
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def remember_category_pages(sender, instance, **kwargs):
+    """
+    Запоминает адрес и публикацию категории и страницы её постов до
+    изменения.
+    """
+    instance._previous_slugs, instance._previous_tags = [], set()
+    instance._previous_published = None
+    if instance.pk is None:
+        return
+    for slug, is_published in Category.objects.filter(
+        pk=instance.pk
+    ).values_list('slug', 'is_published'):
+        instance._previous_slugs = [slug]
+        instance._previous_published = is_published
+    instance._previous_tags = post_page_tags(
+        Post.objects.filter(category_id=instance.pk).values(*FEED_FIELDS)
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    """
+    Пересчитывает видимость постов, если категорию сняли с публикации,
+    опубликовали или удалили, и сбрасывает ленты категории.
+    """
+    if kwargs['signal'] is post_delete:
+        # Посты удалённой категории уже остались без неё (SET_NULL).
+        refresh_visibility(Post.objects.filter(
+            category=None, is_visible=True
+        ))
+    elif instance.is_published != getattr(
+        instance, '_previous_published', None
+    ):
+        refresh_visibility(Post.objects.filter(category_id=instance.pk))
+    invalidate_category_feeds(
+        {instance.slug, *getattr(instance, '_previous_slugs', [])},
+        getattr(instance, '_previous_tags', set()),
+        modification_time(instance, kwargs['signal']),
+    )
+
+
+@receiver(pre_delete, sender=Location)
+@receiver(post_save, sender=Location)
+def invalidate_location(sender, instance, **kwargs):
+    """Сбрасывает страницы постов, в карточках которых видно место."""
+    invalidate_pages(post_page_tags(
+        Post.objects.filter(location_id=instance.pk).values(*FEED_FIELDS)
+    ))
+
+
+def is_login_update(update_fields):
+    return update_fields is not None and set(update_fields) == {'last_login'}
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, **kwargs):
+    instance._previous_username = None
+    if instance.pk is None or is_login_update(update_fields):
+        return
+    instance._previous_username = User.objects.filter(
+        pk=instance.pk
+    ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_profile(sender, instance, update_fields=None, **kwargs):
+    """
+    Сбрасывает страницу профиля, а при смене имени пользователя -
+    и все страницы с его постами.
+    """
+    if is_login_update(update_fields):
+        return
+    usernames = {instance.username}
+    tags = set()
+    previous = getattr(instance, '_previous_username', None)
+    if previous and previous != instance.username:
+        usernames.add(previous)
+        tags |= post_page_tags(instance.posts.values(*FEED_FIELDS))
+    invalidate_lookups('author', usernames)
+    invalidate_pages(tags | {f'author:{name}' for name in usernames})
+
+
+@receiver(post_migrate)
+def restore_search(sender, using, **kwargs):
+    """Возвращает триггеры поиска, если миграция пересоздала таблицы."""
+    if sender.name == 'blog':
+        for table in SEARCH_INDEXES:
+            install_search(connections[using], table)
@@ -8,6 +8,9 @@ urlpatterns = [
     path('',
          views.PostListView.as_view(),
          name='index'),
+    path('search/',
+         views.PostSearchView.as_view(),
+         name='search'),
     path('auth/registration/',
          views.RegistrationCreateView.as_view(),
          name='registration'),
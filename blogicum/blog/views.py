@@ -4,12 +4,21 @@ from django.contrib.auth.models import User
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.urls import reverse, reverse_lazy
+from django.utils.http import urlencode
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 from django.views.generic.edit import CreateView
 
-from core.consts import PAGINATOR_VALUE
-from core.mixins import CommentMixin, IsAuthorMixin, PostMixin
-from core.services import annotation_posts_number_comments, filter_publication
+from core.cache import feed_count_key
+from core.consts import (
+    PAGINATION_NUMBERED, PAGINATOR_VALUE, PROFILE_FIELDS
+)
+from core.mixins import (
+    AnonymousPageCacheMixin, CommentMixin, ConditionalPageMixin,
+    FeedPaginationMixin, IsAuthorMixin, PostMixin, SharedLookupMixin,
+    lookup_once
+)
+from core.search import highlight, search, snippets
+from core.services import filter_publication, project_post_cards
 from .forms import CommentForm, PostForm, ProfileForm
 from .models import Category, Comment, Post
 
@@ -22,20 +31,61 @@ class RegistrationCreateView(CreateView):
     success_url = reverse_lazy('blog:index')
 
 
-class PostListView(ListView):
+class PostListView(ConditionalPageMixin, AnonymousPageCacheMixin,
+                   FeedPaginationMixin, ListView):
     """CBV - Рендер главной стрницы."""
 
     model = Post
     template_name = 'blog/index.html'
-    paginate_by = PAGINATOR_VALUE
 
     def get_queryset(self):
-        return annotation_posts_number_comments(
+        return project_post_cards(
             filter_publication(super().get_queryset())
         )
 
+    def get_page_cache_tags(self):
+        return ('index',)
+
+    def get_count_cache_key(self):
+        return feed_count_key('index')
+
+
+class PostSearchView(FeedPaginationMixin, ListView):
+    """
+    CBV - Поиск по заголовкам и текстам публикаций.
+
+    Страницы поиска не кэшируются: каждый новый запрос создавал бы
+    отдельную запись в кэше.
+    """
+
+    model = Post
+    template_name = 'blog/search.html'
+    pagination_mode = PAGINATION_NUMBERED
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return search(
+            project_post_cards(filter_publication(super().get_queryset())),
+            self.get_search_query(),
+        )
 
-class PostDetailListView(ListView):
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context['page_obj']
+        found = snippets(
+            Post, self.get_search_query(), [post.pk for post in page]
+        )
+        for post in page:
+            post.snippet_html = highlight(found.get(post.pk))
+        context['query'] = self.get_search_query()
+        context['pagination_query'] = urlencode({'q': context['query']})
+        return context
+
+
+class PostDetailListView(ConditionalPageMixin, AnonymousPageCacheMixin,
+                         ListView):
     """CBV - Рендер старницы отдельный постов."""
 
     model = Comment
@@ -43,14 +93,21 @@ class PostDetailListView(ListView):
     paginate_by = PAGINATOR_VALUE
     pk_url_kwarg = 'post_id'
 
+    @lookup_once
     def get_post(self):
-        post = get_object_or_404(Post, id=self.kwargs[self.pk_url_kwarg])
-        if post.author != self.request.user and not post.is_published:
+        post = get_object_or_404(
+            Post.objects.select_related('author', 'category', 'location'),
+            id=self.kwargs[self.pk_url_kwarg],
+        )
+        if post.author_id != self.request.user.pk and not post.is_published:
             raise Http404('Публикация не найдена')
         return post
 
+    def get_page_cache_tags(self):
+        return (f'post:{self.kwargs[self.pk_url_kwarg]}',)
+
     def get_queryset(self):
-        return self.get_post().comments.all()
+        return self.get_post().comments.select_related('author')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -59,52 +116,75 @@ class PostDetailListView(ListView):
         return context
 
 
-class CategoryPostsListView(ListView):
+class CategoryPostsListView(AnonymousPageCacheMixin, SharedLookupMixin,
+                            FeedPaginationMixin, ListView):
     """CBV - Рендер категорий."""
 
     model = Post
     template_name = 'blog/category.html'
-    paginate_by = PAGINATOR_VALUE
 
+    @lookup_once
     def get_category(self):
-        return get_object_or_404(
-            Category,
+        return self.get_shared_object(
+            Category.objects.filter(is_published=True),
+            'category',
             slug=self.kwargs['category_slug'],
-            is_published=True
         )
 
     def get_queryset(self):
-        return annotation_posts_number_comments(
+        return project_post_cards(
             filter_publication(self.get_category().posts.all())
         )
 
+    def get_page_cache_tags(self):
+        return (f'category:{self.kwargs["category_slug"]}',)
+
+    def get_count_cache_key(self):
+        return feed_count_key('category', self.get_category().pk)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['category'] = self.get_category()
         return context
 
 
-class GetProfileListView(ListView):
+class GetProfileListView(AnonymousPageCacheMixin, SharedLookupMixin,
+                         FeedPaginationMixin, ListView):
     """CBV - Рендер страницы пользователей."""
 
     model = Post
     template_name = 'blog/profile.html'
-    paginate_by = PAGINATOR_VALUE
 
+    @lookup_once
     def get_author(self):
-        return get_object_or_404(
-            User,
-            username=self.kwargs['username_slug'])
+        # В общий кэш попадают только поля страницы профиля, без хэша
+        # пароля, почты и флагов доступа.
+        return self.get_shared_object(
+            User.objects.only(*PROFILE_FIELDS),
+            'author',
+            username=self.kwargs['username_slug'],
+        )
 
     def get_queryset(self):
         user = self.get_author()
-        queryset = annotation_posts_number_comments(
+        queryset = project_post_cards(
             user.posts.filter()
         )
         if user != self.request.user:
             queryset = filter_publication(queryset)
         return queryset
 
+    def get_page_cache_tags(self):
+        return (f'author:{self.kwargs["username_slug"]}',)
+
+    def get_count_cache_key(self):
+        author = self.get_author()
+        return feed_count_key(
+            'author',
+            author.pk,
+            'own' if author == self.request.user else 'public',
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['profile'] = self.get_author()
@@ -53,10 +53,43 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
+# CONN_MAX_AGE - сколько секунд соединение переиспользуется между
+# запросами (0 - новое на каждый запрос, None - без ограничения).
+# CONN_HEALTH_CHECKS - проверять соединение перед повторным
+# использованием в начале запроса и закрывать, если оно разорвано.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# Сколько минут хранится число открытых соединений с базой за минуту.
+# Счётчики лежат в кэше: команде db_connection_stats нужен общий бэкенд
+# (Memcached, Redis), с LocMemCache она видит только свой процесс.
+DB_CONNECTION_STATS_MINUTES = 60
+
+# PRAGMA, которые выполняются на каждом новом соединении с SQLite, по
+# порядку: busy_timeout первым, чтобы переход в WAL дождался блокировки.
+# WAL позволяет читать во время записи, synchronous=NORMAL в WAL не
+# теряет целостность, а только последние транзакции при сбое питания.
+# cache_size с минусом - в КиБ, mmap_size - в байтах.
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Для нескольких процессов сервера нужен общий бэкенд (Memcached, Redis),
+# иначе сброс кэша виден только в процессе, где он произошёл.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -104,3 +137,49 @@ LOGIN_URL = 'login'
 CSRF_FAILURE_VIEW = 'pages.views.permission_denied'
 
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Время кэширования изображений, имя которых не содержит хэша, в секундах.
+MEDIA_CACHE_MAX_AGE = 3600
+
+# Передача файлов изображений фронтовому прокси: None - отдаёт Django,
+# 'X-Accel-Redirect' - nginx (internal location MEDIA_ACCEL_PREFIX,
+# указывающий на MEDIA_ROOT), 'X-Sendfile' - Apache mod_xsendfile.
+MEDIA_SENDFILE_HEADER = None
+
+MEDIA_ACCEL_PREFIX = '/internal-media/'
+
+# Ширины, до которых MEDIA_URL + r/<ширина>/<путь> уменьшает изображения без
+# подписи; другие ширины до IMAGE_RESIZE_MAX_WIDTH - по подписанной ссылке.
+IMAGE_RESIZE_WIDTHS = (160, 320, 480, 640, 960, 1280, 1920)
+
+IMAGE_RESIZE_MAX_WIDTH = 2560
+
+# Каталог кэша уменьшенных версий внутри MEDIA_ROOT и его предельный размер
+# в байтах. Размер поддерживает команда trim_resize_cache, запускаемая по
+# расписанию (cron).
+IMAGE_RESIZE_CACHE_DIR = 'cache/resized'
+
+IMAGE_RESIZE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Режим пагинации лент: 'keyset' (курсор по pub_date, id) или 'numbered'.
+FEED_PAGINATION_MODE = 'numbered'
+
+# Время жизни закэшированного числа записей ленты, в секундах.
+FEED_COUNT_CACHE_TIMEOUT = 300
+
+# Предел подсчёта записей ленты; None - точный COUNT(*).
+FEED_COUNT_LIMIT = None
+
+# Предел подсчёта записей в списках админки с LimitedCountAdminMixin.
+ADMIN_COUNT_LIMIT = 10_000
+
+# Сколько новейших совпадений поиска в админке (слов и авторов вместе)
+# просматривается: в списке видны только они.
+ADMIN_SEARCH_LIMIT = 10_000
+
+# Время жизни страниц в кэше для анонимных посетителей, в секундах.
+PAGE_CACHE_TIMEOUT = 300
+
+# Время жизни категорий и авторов, найденных по адресу страницы, в общем
+# кэше, в секундах; None - искать в базе на каждый запрос.
+LOOKUP_CACHE_TIMEOUT = 300
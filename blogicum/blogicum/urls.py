@@ -1,15 +1,20 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from core.views import MEDIA_PREFIX, resize_image, serve_media
+
 urlpatterns = [
     path('auth/', include('django.contrib.auth.urls')),
     path('admin/', admin.site.urls),
     path('', include('blog.urls', namespace='blog')),
     path('pages/', include('pages.urls', namespace='pages')),
     path('auth/registration/', include('blog.urls', namespace='registration')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path(f'{settings.MEDIA_URL.lstrip("/")}{MEDIA_PREFIX}/<path:path>',
+         serve_media, name='media'),
+    path(f'{settings.MEDIA_URL.lstrip("/")}r/<int:width>/<path:path>',
+         resize_image, name='resize'),
+]
 
 handler403 = 'pages.views.permission_denied'
 handler404 = 'pages.views.page_not_found'
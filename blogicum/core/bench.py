@@ -0,0 +1,164 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from statistics import median
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection, transaction
+from django.utils.timezone import now
+
+from blog.models import Category, Comment, Location, Post
+from core.consts import PAGINATOR_VALUE
+from core.services import filter_publication, project_post_cards
+from core.text import make_excerpt, render_text
+
+BATCH_SIZE = 10_000
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rollback_after():
+    """Выполняет бенчмарк в транзакции и откатывает все тестовые данные."""
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def seed_posts(count, text_size=200, stdout=None):
+    """Создаёт `count` опубликованных постов с убывающей датой публикации."""
+    author = User.objects.create(username='bench_author')
+    category = Category.objects.create(
+        title='Бенчмарк', description='Бенчмарк', slug='bench'
+    )
+    location = Location.objects.create(name='Бенчмарк')
+    text = ('Текст публикации ' * (text_size // 17 + 1))[:text_size]
+    excerpt, text_html = make_excerpt(text), render_text(text)
+    start = now() - timedelta(minutes=1)
+    for offset in range(0, count, BATCH_SIZE):
+        Post.objects.bulk_create(
+            Post(
+                title=f'Публикация {number}',
+                text=text,
+                excerpt=excerpt,
+                text_html=text_html,
+                pub_date=start - timedelta(seconds=number),
+                is_visible=True,
+                author=author,
+                location=location,
+                category=category,
+            )
+            for number in range(offset, min(offset + BATCH_SIZE, count))
+        )
+        if stdout:
+            stdout.write(f'\rСоздано {min(offset + BATCH_SIZE, count)}',
+                         ending='')
+    if stdout:
+        stdout.write('')
+    return author, category
+
+
+def contiguous_ids(queryset):
+    """Первый id записей, созданных одним bulk_create подряд."""
+    ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+    assert ids[-1] - ids[0] == len(ids) - 1, 'id записей идут с пропусками'
+    return ids[0]
+
+
+def seed_comments(count, posts=1000, authors=1000, stdout=None):
+    """
+    Создаёт `count` комментариев от `authors` пользователей bench_user_NNNN
+    к `posts` постам, по одному в секунду до текущего момента: в тексте
+    каждого одна из четырёх птиц, в каждом десятитысячном - «редкость».
+
+    Комментарии вставляются запросом INSERT ... SELECT в самой SQLite:
+    через bulk_create миллионы строк создавались бы часами.
+    """
+    author, category = seed_posts(posts)
+    first_post = contiguous_ids(author.posts.all())
+    User.objects.bulk_create(
+        User(username=f'bench_user_{number:04d}') for number in range(authors)
+    )
+    first_author = contiguous_ids(
+        User.objects.filter(username__startswith='bench_user_')
+    )
+    start = now().strftime('%Y-%m-%d %H:%M:%S')
+    for offset in range(0, count, BATCH_SIZE * 10):
+        last = min(offset + BATCH_SIZE * 10, count)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH RECURSIVE seq(n) AS (
+                    SELECT %s UNION ALL SELECT n + 1 FROM seq WHERE n < %s
+                )
+                INSERT INTO {Comment._meta.db_table}
+                    (text, post_id, author_id, created_at)
+                SELECT
+                    'Комментарий ' || n || ' про ' || CASE n %% 4
+                        WHEN 0 THEN 'скворцов' WHEN 1 THEN 'грачей'
+                        WHEN 2 THEN 'ласточек' ELSE 'синиц' END
+                    || CASE WHEN n %% 10000 = 0 THEN ' редкость' ELSE '' END,
+                    %s + n %% %s,
+                    %s + n %% %s,
+                    datetime(%s, '-' || (%s - n) || ' seconds')
+                FROM seq
+                """,
+                (offset, last - 1, first_post, posts, first_author, authors,
+                 start, count),
+            )
+        if stdout:
+            stdout.write(f'\rСоздано {last}', ending='')
+    if stdout:
+        stdout.write('')
+
+
+def measure(func, repeat=5):
+    """Возвращает медианное время выполнения `func` в миллисекундах."""
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        func()
+        timings.append((perf_counter() - started) * 1000)
+    return median(timings)
+
+
+def mixed_load(path, pragmas, seconds, write_share, post_ids, author_id):
+    """
+    Процесс нагрузки на базу `path` с PRAGMA `pragmas`: `seconds` секунд
+    читает первую страницу главной ленты, а с долей `write_share` вместо
+    чтения добавляет комментарий. Возвращает время чтений и записей в
+    миллисекундах и число ошибок «database is locked».
+    """
+    settings.SQLITE_PRAGMAS = pragmas
+    connection.close()
+    connection.settings_dict['NAME'] = path
+    reads, writes, locked = [], [], 0
+    deadline = perf_counter() + seconds
+    while perf_counter() < deadline:
+        started = perf_counter()
+        try:
+            if random.random() < write_share:
+                Comment.objects.create(
+                    text='Комментарий бенчмарка',
+                    post_id=random.choice(post_ids),
+                    author_id=author_id,
+                )
+                timings = writes
+            else:
+                list(project_post_cards(
+                    filter_publication(Post.objects.all())
+                )[:PAGINATOR_VALUE])
+                timings = reads
+        except OperationalError:
+            locked += 1
+            continue
+        timings.append((perf_counter() - started) * 1000)
+    connection.close()
+    return reads, writes, locked
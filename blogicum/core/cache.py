@@ -0,0 +1,156 @@
+from hashlib import md5
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.utils.timezone import now
+
+FEED_COUNT_GENERATION_KEY = 'feed_count:generation'
+
+FEED_FIELDS = (
+    'pk', 'category_id', 'category__slug', 'author_id', 'author__username'
+)
+
+
+def feed_count_key(*parts):
+    """
+    Ключ кэша числа записей ленты.
+
+    В ключ входит поколение счётчиков: его увеличение разом сбрасывает
+    все закэшированные итоги, например при снятии категории с публикации.
+    """
+    generation = cache.get_or_set(
+        FEED_COUNT_GENERATION_KEY, uuid4().hex, None
+    )
+    return ':'.join(map(str, ('feed_count', generation, *parts)))
+
+
+def invalidate_feed_counts(category_ids=(), author_ids=()):
+    """Сбрасывает итоги главной ленты и лент указанных категорий и авторов."""
+    keys = [feed_count_key('index')]
+    keys.extend(
+        feed_count_key('category', pk) for pk in category_ids if pk
+    )
+    for pk in author_ids:
+        keys.append(feed_count_key('author', pk, 'public'))
+        keys.append(feed_count_key('author', pk, 'own'))
+    cache.delete_many(keys)
+
+
+def invalidate_all_feed_counts():
+    """Сбрасывает итоги всех лент сменой поколения счётчиков."""
+    cache.set(FEED_COUNT_GENERATION_KEY, uuid4().hex, None)
+
+
+def post_page_tags(rows):
+    """
+    Теги страниц, на которых видны посты: главная, страница поста,
+    категории и автора. `rows` - словари с полями FEED_FIELDS.
+    """
+    tags = {'index'}
+    for row in rows:
+        tags.add(f'post:{row["pk"]}')
+        tags.add(f'author:{row["author__username"]}')
+        if row['category__slug']:
+            tags.add(f'category:{row["category__slug"]}')
+    return tags
+
+
+def page_tag_revisions(tags):
+    """
+    Ревизии тегов страницы вместе с общим тегом `site`: пары из версии
+    и времени последнего изменения. Сброс тега выдаёт ему новую ревизию.
+    """
+    keys = [f'page_tag:{tag}' for tag in sorted({'site', *tags})]
+    revisions = cache.get_many(keys)
+    missing = {
+        key: (uuid4().hex, now()) for key in keys if key not in revisions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        revisions.update(missing)
+    return [revisions[key] for key in keys]
+
+
+def page_cache_key(path, tags):
+    """
+    Ключ страницы в кэше: адрес с параметрами запроса и текущие версии
+    тегов страницы, поэтому сброс любого тега меняет ключ.
+    """
+    versions = [version for version, _ in page_tag_revisions(tags)]
+    raw = '|'.join([path, *versions])
+    return f'page:{md5(raw.encode()).hexdigest()}'
+
+
+def page_validators(path, tags):
+    """
+    Валидаторы страницы - ETag и время изменения - по ревизиям её тегов,
+    без запросов к базе.
+    """
+    revisions = page_tag_revisions(tags)
+    raw = '|'.join([path, *(version for version, _ in revisions)])
+    return (
+        f'"{md5(raw.encode()).hexdigest()}"',
+        max(modified_at for _, modified_at in revisions),
+    )
+
+
+def invalidate_pages(tags, modified_at=None):
+    """
+    Выдаёт новые ревизии тегам страниц, сбрасывая закэшированные
+    страницы. `modified_at` - время изменения, обычно updated_at
+    сохранённой записи.
+    """
+    modified_at = modified_at or now()
+    cache.set_many({
+        f'page_tag:{tag}': (uuid4().hex, modified_at) for tag in tags
+    }, None)
+
+
+def invalidate_post_feeds(rows, modified_at=None):
+    """Сбрасывает итоги и страницы лент, в которые входят посты."""
+    invalidate_feed_counts(
+        category_ids={row['category_id'] for row in rows},
+        author_ids={row['author_id'] for row in rows},
+    )
+    invalidate_pages(post_page_tags(rows), modified_at)
+
+
+def invalidate_all_feeds():
+    """Сбрасывает итоги всех лент и все закэшированные страницы."""
+    invalidate_all_feed_counts()
+    invalidate_pages({'site'})
+
+
+def record_page_cache(result):
+    """Учитывает попадание (`hits`) или промах (`misses`) кэша страниц."""
+    key = f'page_cache:{result}'
+    cache.add(key, 0, None)
+    cache.incr(key)
+
+
+def page_cache_stats():
+    stats = cache.get_many(('page_cache:hits', 'page_cache:misses'))
+    hits = stats.get('page_cache:hits', 0)
+    misses = stats.get('page_cache:misses', 0)
+    total = hits + misses
+    return hits, misses, hits / total if total else 0
+
+
+def lookup_cache_key(kind, value):
+    """Ключ объекта, найденного по параметру URL (slug, имени автора)."""
+    return f'lookup:{kind}:{value}'
+
+
+def invalidate_lookups(kind, values):
+    cache.delete_many([lookup_cache_key(kind, value) for value in values])
+
+
+def invalidate_category_feeds(slugs, tags=(), modified_at=None):
+    """
+    Публикация категории влияет на ленты всех авторов её постов,
+    поэтому сбрасываются итоги всех лент.
+    """
+    invalidate_all_feed_counts()
+    invalidate_lookups('category', slugs)
+    invalidate_pages({'index', *(f'category:{slug}' for slug in slugs),
+                      *tags}, modified_at)
@@ -3,3 +3,17 @@ MAX_LENGTH = 256
 SLICE = 20
 
 PAGINATOR_VALUE = 10
+
+PAGINATION_NUMBERED = 'numbered'
+
+PAGINATION_KEYSET = 'keyset'
+
+PROFILE_FIELDS = (
+    'username', 'first_name', 'last_name', 'date_joined', 'is_staff'
+)
+
+EXCERPT_WORDS = 10
+
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+
+IMAGE_VARIANTS_DIR = 'posts_images/variants'
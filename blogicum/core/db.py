@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+MINUTE_FORMAT = '%Y-%m-%dT%H:%M'
+
+
+def connection_opens_key(minute):
+    return f'db_connections:{minute:{MINUTE_FORMAT}}'
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Настраивает каждое новое соединение с SQLite по SQLITE_PRAGMAS."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def record_connection_open(sender, connection, **kwargs):
+    """
+    Учитывает открытие соединения в счётчике текущей минуты. Ошибки
+    кэша (ключ вытеснен между add и incr, бэкенд недоступен) только
+    теряют отметку и не мешают открыть соединение.
+    """
+    key = connection_opens_key(now())
+    try:
+        cache.add(key, 0, settings.DB_CONNECTION_STATS_MINUTES * 60)
+        cache.incr(key)
+    except Exception:
+        pass
+
+
+def connection_opens(minutes=None):
+    """Число открытых соединений по минутам, от самой ранней до текущей."""
+    minutes = minutes or settings.DB_CONNECTION_STATS_MINUTES
+    current = now().replace(second=0, microsecond=0)
+    keys = [
+        connection_opens_key(current - timedelta(minutes=ago))
+        for ago in reversed(range(minutes))
+    ]
+    counts = cache.get_many(keys)
+    return [
+        (key.split(':', 1)[1], counts.get(key, 0)) for key in keys
+    ]
+
+
+@receiver(request_started)
+def check_connections(**kwargs):
+    """
+    Закрывает постоянные соединения, которые перестали отвечать, чтобы
+    запрос открыл новое, а не упал на разорванном.
+
+    Соединения, срок которых истёк, Django закрывает раньше, на этом же
+    сигнале. Проверка - is_usable() бэкенда: SELECT 1 у PostgreSQL и
+    MySQL, у SQLite без запросов.
+    """
+    for connection in connections.all():
+        if (
+            connection.connection is None
+            or connection.in_atomic_block
+            or not connection.settings_dict.get('CONN_HEALTH_CHECKS')
+        ):
+            continue
+        if not connection.is_usable():
+            connection.close()
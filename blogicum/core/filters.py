@@ -0,0 +1,63 @@
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.forms import Media
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Фильтр по внешнему ключу с полем автодополнения.
+
+    В отличие от RelatedFieldListFilter не выводит всех пользователей,
+    местоположения или категории: варианты по мере ввода подгружает
+    admin:autocomplete, а выбранный объект читается одним запросом.
+    У админки связанной модели должны быть search_fields.
+    """
+
+    template = 'admin/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin,
+                 field_path):
+        self.lookup_kwarg = (
+            f'{field_path}__{field.target_field.attname}__exact'
+        )
+        self.lookup_val = params.get(self.lookup_kwarg)
+        super().__init__(
+            field, request, params, model, model_admin, field_path
+        )
+        self.widget = AutocompleteSelect(
+            field, model_admin.admin_site, attrs={'data-width': '100%'}
+        )
+        self.widget.choices = field.formfield().choices
+
+    def has_output(self):
+        return True
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.lookup_val is None,
+            'query_string': changelist.get_query_string(
+                remove=[self.lookup_kwarg]
+            ),
+            'display': 'Все',
+            'widget': self.widget.render(self.lookup_kwarg, self.lookup_val),
+        }
+
+
+class AutocompleteFilterMixin:
+    """Миксин админки, подключающий скрипты для AutocompleteFilter."""
+
+    @property
+    def media(self):
+        field = next(
+            self.model._meta.get_field(item[0])
+            for item in self.list_filter
+            if isinstance(item, tuple) and item[1] is AutocompleteFilter
+        )
+        return (
+            super().media
+            + AutocompleteSelect(field, self.admin_site).media
+            + Media(js=('js/autocomplete_filter.js',))
+        )
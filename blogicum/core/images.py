@@ -0,0 +1,200 @@
+import os
+from hashlib import sha256
+from io import BytesIO
+from math import ceil
+from pathlib import PurePosixPath
+from time import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.signing import Signer
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from core.consts import IMAGE_VARIANT_WIDTHS, IMAGE_VARIANTS_DIR
+from core.storage import shard_path
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+# Формат уменьшенной версии по расширению оригинала; остальные - PNG.
+RESIZE_FORMATS = {'.jpg': 'JPEG', '.jpeg': 'JPEG', '.webp': 'WEBP'}
+RESIZE_SIGNER = Signer(salt='core.images.resize')
+# Тег EXIF с ориентацией и её значения, при которых кадр повёрнут на 90°.
+EXIF_ORIENTATION = 0x0112
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+# Отметка последнего обращения к файлу кэша обновляется не чаще, чем раз
+# в столько секунд.
+TOUCH_INTERVAL = 60
+
+
+def build_variants(name):
+    """
+    Создаёт уменьшенные копии изображения `name` в хранилище: для каждой
+    ширины из IMAGE_VARIANT_WIDTHS, не больше исходной, - JPEG (PNG для
+    картинок с прозрачностью) и WebP.
+
+    Возвращает описание копий для поля Post.image_variants. Функция
+    не обращается к базе, поэтому подходит для пула процессов.
+    """
+    variants = {'source': name, 'sizes': []}
+    try:
+        with default_storage.open(name) as file, Image.open(file) as image:
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except (OSError, UnidentifiedImageError):
+        # Файла нет или это не изображение: выводится оригинал.
+        return variants
+    variants['width'], variants['height'] = image.size
+    has_alpha = 'A' in image.getbands()
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    fallback = 'PNG' if has_alpha else 'JPEG'
+    stem = PurePosixPath(name).stem
+    widths = [width for width in IMAGE_VARIANT_WIDTHS if width < image.width]
+    for width in widths or [image.width]:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        variants['sizes'].append({
+            'width': width,
+            'height': height,
+            'fallback': save_variant(resized, f'{stem}_{width}', fallback),
+            'webp': save_variant(resized, f'{stem}_{width}', 'WEBP'),
+        })
+    return variants
+
+
+def save_variant(image, stem, image_format):
+    buffer = BytesIO()
+    options = {
+        'JPEG': {'quality': JPEG_QUALITY, 'optimize': True},
+        'WEBP': {'quality': WEBP_QUALITY, 'method': 6},
+        'PNG': {'optimize': True},
+    }[image_format]
+    image.save(buffer, image_format, **options)
+    suffix = f'.{EXTENSIONS[image_format]}'
+    return default_storage.save(
+        shard_path(IMAGE_VARIANTS_DIR, stem, suffix),
+        ContentFile(buffer.getvalue()),
+    )
+
+
+def delete_variants(variants):
+    """Удаляет из хранилища файлы уменьшенных копий."""
+    for size in (variants or {}).get('sizes', ()):
+        for key in ('fallback', 'webp'):
+            default_storage.delete(size[key])
+
+
+def srcset(variants, key):
+    """Значение атрибута srcset для копий формата `key`."""
+    return ', '.join(
+        f'{default_storage.url(size[key])} {size["width"]}w'
+        for size in (variants or {}).get('sizes', ())
+    )
+
+
+def resize_signature(name, width):
+    return RESIZE_SIGNER.signature(f'{width}/{name}')
+
+
+def resize_allowed(name, width, signature=''):
+    """Ширина из списка IMAGE_RESIZE_WIDTHS или ссылка подписана."""
+    if not 0 < width <= settings.IMAGE_RESIZE_MAX_WIDTH:
+        return False
+    return width in settings.IMAGE_RESIZE_WIDTHS or constant_time_compare(
+        signature, resize_signature(name, width)
+    )
+
+
+def resize_url(name, width):
+    """Адрес уменьшенной версии; ширины не из списка подписываются."""
+    url = reverse('resize', kwargs={'width': width, 'path': name})
+    if width in settings.IMAGE_RESIZE_WIDTHS:
+        return url
+    return f'{url}?s={resize_signature(name, width)}'
+
+
+def resized_image(name, width):
+    """
+    Имя уменьшенной до `width` версии изображения `name` в дисковом
+    кэше; при промахе версия создаётся. Запись идёт во временный файл с
+    последующим переименованием, поэтому параллельные запросы одной
+    версии не видят недописанный файл.
+    """
+    suffix = PurePosixPath(name).suffix.lower()
+    image_format = RESIZE_FORMATS.get(suffix, 'PNG')
+    cached = shard_path(
+        settings.IMAGE_RESIZE_CACHE_DIR,
+        sha256(f'{width}:{name}'.encode()).hexdigest(),
+        f'.{EXTENSIONS[image_format]}',
+    )
+    path = default_storage.path(cached)
+    try:
+        if time() - os.stat(path).st_mtime > TOUCH_INTERVAL:
+            os.utime(path)
+        return cached
+    except FileNotFoundError:
+        pass
+    with default_storage.open(name) as file, Image.open(file) as image:
+        # draft() до поворота по EXIF: JPEG декодируется сразу в масштабе
+        # 1/2, 1/4 или 1/8, не меньше нужного. exif_transpose() декодирует
+        # изображение целиком, поэтому вызывается только после него.
+        rotated = (
+            image.getexif().get(EXIF_ORIENTATION) in ROTATED_ORIENTATIONS
+        )
+        scale = min(width / (image.height if rotated else image.width), 1)
+        image.draft(
+            'RGB', (ceil(image.width * scale), ceil(image.height * scale))
+        )
+        image = ImageOps.exif_transpose(image)
+        # thumbnail() никогда не увеличивает изображение.
+        image.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+        if image_format == 'JPEG':
+            image = image.convert('RGB')
+        elif image.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+            image = image.convert('RGBA')
+        buffer = BytesIO()
+        image.save(buffer, image_format, quality=JPEG_QUALITY)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.{uuid4().hex}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(buffer.getvalue())
+    os.replace(temporary, path)
+    return cached
+
+
+def trim_resize_cache(max_bytes=None):
+    """
+    Удаляет давно не запрашивавшиеся версии, пока кэш больше
+    IMAGE_RESIZE_CACHE_MAX_BYTES, с запасом в 10%. Возвращает число
+    удалённых файлов. Обходит весь каталог кэша, поэтому вызывается
+    командой trim_resize_cache по расписанию, а не из запросов.
+    """
+    max_bytes = max_bytes or settings.IMAGE_RESIZE_CACHE_MAX_BYTES
+    root = default_storage.path(settings.IMAGE_RESIZE_CACHE_DIR)
+    files, total = [], 0
+    for directory, _, names in os.walk(root):
+        for filename in names:
+            path = os.path.join(directory, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    if total <= max_bytes:
+        return 0
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= max_bytes * 0.9:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,119 @@
+from concurrent.futures import as_completed
+from datetime import timedelta
+from uuid import uuid4
+
+from django.db.models import F
+from django.utils.timezone import now
+
+from blog.models import Post
+from core.images import build_variants, delete_variants
+from core.models import Job
+from core.services import save_image_variants
+
+IMAGE_VARIANTS = 'image_variants'
+MAX_ATTEMPTS = 3
+# Задача, которая выполняется дольше, считается брошенной упавшим
+# обработчиком и возвращается в очередь.
+JOB_TIMEOUT = timedelta(minutes=10)
+
+
+def enqueue(kind, object_id):
+    """Ставит задачу в очередь, если такая же ещё не ожидает выполнения."""
+    if not Job.objects.filter(
+        kind=kind, object_id=object_id, status=Job.PENDING
+    ).exists():
+        Job.objects.create(kind=kind, object_id=object_id)
+
+
+def claim_jobs(limit):
+    """
+    Забирает до `limit` ожидающих задач одним UPDATE, поэтому несколько
+    обработчиков не получат одну и ту же задачу.
+    """
+    token = uuid4().hex
+    Job.objects.filter(pk__in=Job.objects.filter(
+        status=Job.PENDING
+    ).order_by('pk').values('pk')[:limit]).update(
+        status=Job.RUNNING,
+        claim=token,
+        started_at=now(),
+        attempts=F('attempts') + 1,
+    )
+    return list(Job.objects.filter(claim=token, status=Job.RUNNING))
+
+
+def requeue_stale_jobs():
+    """Возвращает в очередь задачи, брошенные упавшими обработчиками."""
+    return Job.objects.filter(
+        status=Job.RUNNING, started_at__lt=now() - JOB_TIMEOUT
+    ).update(status=Job.PENDING, claim='')
+
+
+def fail_job(job, error):
+    """Возвращает задачу в очередь или, после MAX_ATTEMPTS, помечает ошибку."""
+    job.status = Job.PENDING if job.attempts < MAX_ATTEMPTS else Job.FAILED
+    job.claim = ''
+    job.error = repr(error)
+    job.save(update_fields=('status', 'claim', 'error'))
+
+
+def image_variants_args(job):
+    name = Post.objects.filter(pk=job.object_id).values_list(
+        'image', flat=True
+    ).first()
+    return (name,) if name else None
+
+
+def store_image_variants(job, name, variants):
+    """
+    Сохраняет копии, если изображение поста не сменилось, пока они
+    создавались; иначе копии устарели и удаляются.
+    """
+    post = Post.objects.filter(pk=job.object_id).only(
+        'image', 'image_variants'
+    ).first()
+    if post is None or post.image.name != name:
+        delete_variants(variants)
+        return
+    delete_variants(post.image_variants)
+    save_image_variants(post.pk, variants)
+
+
+# Тип задачи: подготовка аргументов в основном процессе, работа в пуле
+# процессов без обращений к базе и сохранение результата.
+HANDLERS = {
+    IMAGE_VARIANTS: (image_variants_args, build_variants,
+                     store_image_variants),
+}
+
+
+def run_jobs(pool, limit):
+    """
+    Выполняет до `limit` задач: тяжёлую часть - в пуле процессов `pool`,
+    запись результатов - в текущем процессе. Возвращает число задач.
+    """
+    futures = {}
+    jobs = claim_jobs(limit)
+    for job in jobs:
+        try:
+            prepare, work, store = HANDLERS[job.kind]
+            args = prepare(job)
+        except Exception as error:
+            # Неизвестный тип или ошибка подготовки не должны оставлять
+            # остальные забранные задачи в статусе RUNNING.
+            fail_job(job, error)
+            continue
+        if args is None:
+            # Объект удалён или работы для него больше нет.
+            job.delete()
+            continue
+        futures[pool.submit(work, *args)] = (job, store, args)
+    for future in as_completed(futures):
+        job, store, args = futures[future]
+        try:
+            store(job, *args, future.result())
+        except Exception as error:
+            fail_job(job, error)
+        else:
+            job.delete()
+    return len(jobs)
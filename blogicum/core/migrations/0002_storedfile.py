@@ -0,0 +1,30 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Имя файла')),
+                ('references', models.PositiveIntegerField(default=0, verbose_name='Ссылки')),
+                ('released_at', models.DateTimeField(blank=True, null=True, verbose_name='Последняя ссылка снята')),
+            ],
+            options={
+                'verbose_name': 'файл хранилища',
+                'verbose_name_plural': 'Файлы хранилища',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='storedfile',
+            index=models.Index(condition=models.Q(('references', 0)), fields=['released_at'], name='storedfile_orphan_idx'),
+        ),
+    ]
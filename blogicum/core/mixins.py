@@ -1,17 +1,210 @@
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.admin.options import get_content_type_for_model
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.mixins import UserPassesTestMixin
-from django.shortcuts import redirect
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 
 from blog.forms import CommentForm, PostForm
 from blog.models import Comment, Post
+from core.cache import (
+    lookup_cache_key, page_cache_key, page_validators, record_page_cache
+)
+from core.consts import PAGINATION_KEYSET, PAGINATOR_VALUE
+from core.paginators import (
+    CachedCountPaginator, InvalidCursor, KeysetPaginator
+)
+from core.scheduling import publication_horizon
+from core.search import (
+    match_expression, matching_ids, split_search_term, username_prefixes
+)
+
+
+def lookup_once(method):
+    """
+    Декоратор метода представления, находящего объект по параметрам URL:
+    объект ищется один раз за запрос и запоминается в представлении.
+    """
+    attr = f'_{method.__name__}_result'
+
+    @wraps(method)
+    def wrapper(self):
+        if attr not in self.__dict__:
+            self.__dict__[attr] = method(self)
+        return self.__dict__[attr]
+
+    return wrapper
+
+
+class SharedLookupMixin:
+    """
+    Миксин поиска объекта по параметру URL через общий кэш.
+
+    При LOOKUP_CACHE_TIMEOUT = None объект всегда берётся из базы; сигналы
+    блога сбрасывают закэшированные категории и авторов при изменении.
+    Изменения в обход сигналов (QuerySet.update) видны через
+    LOOKUP_CACHE_TIMEOUT. В кэш попадают только поля, выбранные в
+    `queryset`, поэтому для пользователей он ограничивается через only().
+    """
+
+    def get_shared_object(self, queryset, kind, **lookup):
+        timeout = settings.LOOKUP_CACHE_TIMEOUT
+        if not timeout:
+            return get_object_or_404(queryset, **lookup)
+        key = lookup_cache_key(kind, *lookup.values())
+        obj = cache.get(key)
+        if obj is None:
+            obj = get_object_or_404(queryset, **lookup)
+            cache.set(key, obj, timeout)
+        return obj
+
+
+class AnonymousPageCacheMixin:
+    """
+    Миксин кэширования страницы целиком для анонимных посетителей.
+
+    Ключ строится по полному адресу запроса и версиям тегов из
+    `get_page_cache_tags`; сигналы блога сбрасывают теги при изменении
+    постов, комментариев, категорий и местоположений. По умолчанию
+    страница зависит только от общего тега `site`.
+    Авторизованные пользователи всегда получают свежую страницу.
+    """
+
+    page_cache_tags = ('site',)
+
+    def get_page_cache_tags(self):
+        return self.page_cache_tags
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        # Наступившие отложенные публикации сбрасывают теги до поиска.
+        publication_horizon()
+        key = page_cache_key(
+            request.get_full_path(), self.get_page_cache_tags()
+        )
+        response = cache.get(key)
+        if response is not None:
+            record_page_cache('hits')
+            response['X-Page-Cache'] = 'HIT'
+            return response
+        record_page_cache('misses')
+        response = super().dispatch(request, *args, **kwargs)
+        response['X-Page-Cache'] = 'MISS'
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key, rendered, settings.PAGE_CACHE_TIMEOUT
+                )
+            )
+        return response
+
+
+class ConditionalPageMixin:
+    """
+    Миксин условного GET: ETag и Last-Modified страницы строятся по
+    ревизиям тегов из `get_page_cache_tags`, и на совпадающие
+    If-None-Match / If-Modified-Since отдаётся 304 без запросов страницы.
+    Ставится в MRO перед AnonymousPageCacheMixin.
+
+    Только для анонимных посетителей: страница авторизованного содержит
+    CSRF-токен формы комментария, который меняется при входе, и ревизии
+    тегов не знают о его смене.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or request.user.is_authenticated
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        publication_horizon()
+        etag, modified_at = page_validators(
+            request.get_full_path(), self.get_page_cache_tags()
+        )
+        last_modified = int(modified_at.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class FeedPaginationMixin:
+    """
+    Миксин пагинации лент публикаций.
+
+    Режим задаётся атрибутом `pagination_mode` или настройкой
+    FEED_PAGINATION_MODE: нумерованные страницы (`?page=`) либо
+    курсор по ключу (pub_date, id) (`?after=` / `?before=`).
+    В нумерованном режиме итог ленты кэшируется по `get_count_cache_key`.
+    """
+
+    paginate_by = PAGINATOR_VALUE
+    paginator_class = CachedCountPaginator
+    pagination_mode = None
+
+    def get_pagination_mode(self):
+        return self.pagination_mode or settings.FEED_PAGINATION_MODE
+
+    def get_count_cache_key(self):
+        return None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset,
+            per_page,
+            cache_key=self.get_count_cache_key(),
+            count_limit=settings.FEED_COUNT_LIMIT,
+            **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.get_pagination_mode() != PAGINATION_KEYSET:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before'),
+            )
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
 
 
 class IsAuthorMixin(UserPassesTestMixin):
-    """Миксин проверки авторства."""
+    """
+    Миксин проверки авторства.
+
+    Объект запоминается на время запроса, поэтому проверка и
+    UpdateView/DeleteView обходятся одним запросом; автор сравнивается
+    по author_id без загрузки пользователя.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if '_object' not in self.__dict__:
+            self._object = super().get_object()
+        return self._object
 
     def test_func(self):
-        return self.get_object().author == self.request.user
+        return self.get_object().author_id == self.request.user.pk
 
 
 class PostMixin(IsAuthorMixin, LoginRequiredMixin):
@@ -44,6 +237,100 @@ class CommentMixin(LoginRequiredMixin):
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
 
+    def get_queryset(self):
+        return super().get_queryset().filter(post_id=self.kwargs['post_id'])
+
     def get_success_url(self):
         return reverse('blog:post_detail',
                        kwargs={'post_id': self.kwargs['post_id']})
+
+
+class IndexedSearchAdminMixin:
+    """
+    Миксин поиска в админке по полнотекстовому индексу вместо
+    LIKE '%...%' по каждому полю из search_fields.
+
+    Слова с @ в начале - префиксы имён авторов: они ищутся диапазоном
+    по индексу auth_user.username, а не перебором всех пользователей.
+    Вместе со словами авторы отбираются в самом полнотекстовом индексе
+    по его столбцу author_id.
+    Слова ищутся целиком, префикс - только со звёздочкой (`скворц*`);
+    в автодополнении последнее слово всегда ищется как префикс.
+    Совпадения всех условий вместе ограничиваются ADMIN_SEARCH_LIMIT
+    новейшими записями, поэтому список не сортирует все совпадения
+    частого слова или активного автора.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        query, authors = split_search_term(search_term)
+        has_words = match_expression(query) is not None
+        if connection.vendor != 'sqlite' or not (has_words or authors):
+            return super().get_search_results(request, queryset, search_term)
+        limit = settings.ADMIN_SEARCH_LIMIT
+        users = User.objects.filter(username_prefixes(authors))
+        if not has_words:
+            found = self.model.objects.filter(
+                author__in=users
+            ).order_by('-pk').values('pk')[:limit]
+        else:
+            author_ids = list(
+                users.values_list('pk', flat=True)
+            ) if authors else []
+            if authors and not author_ids:
+                return queryset.none(), False
+            prefix = getattr(
+                request.resolver_match, 'url_name', None
+            ) == 'autocomplete'
+            found = matching_ids(self.model, query, limit, prefix, author_ids)
+        queryset = queryset.filter(pk__in=found)
+        return queryset, False
+
+
+class LimitedCountAdminMixin:
+    """
+    Миксин списка админки без полного COUNT(*) по таблице: записи
+    считаются не дальше ADMIN_COUNT_LIMIT, общий итог не выводится.
+    """
+
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        return CachedCountPaginator(
+            queryset,
+            per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            count_limit=settings.ADMIN_COUNT_LIMIT,
+        )
+
+
+class BulkDeleteAdminMixin:
+    """
+    Миксин группового удаления в админке.
+
+    «Удалить выбранные» пишет журнал удалений одним bulk_create вместо
+    INSERT на каждый объект, а сами объекты удаляет `delete_objects`:
+    по умолчанию обычным QuerySet.delete(), в админках блога -
+    групповыми запросами.
+    """
+
+    def delete_objects(self, queryset):
+        queryset.delete()
+
+    def log_deletion(self, request, object, object_repr):
+        if request.POST.get('action') != 'delete_selected':
+            return super().log_deletion(request, object, object_repr)
+        if not hasattr(request, '_deletion_log'):
+            request._deletion_log = []
+        request._deletion_log.append(LogEntry(
+            user_id=request.user.pk,
+            content_type_id=get_content_type_for_model(object).pk,
+            object_id=str(object.pk),
+            object_repr=object_repr[:200],
+            action_flag=DELETION,
+        ))
+
+    def delete_queryset(self, request, queryset):
+        LogEntry.objects.bulk_create(getattr(request, '_deletion_log', []))
+        self.delete_objects(queryset)
@@ -28,6 +28,18 @@ class CreatedModel(models.Model):
         ordering = ('created_at',)
 
 
+class UpdatedModel(models.Model):
+    """Модель абстрактного класса Изменено."""
+
+    updated_at = models.DateTimeField(
+        'Изменено',
+        auto_now=True
+    )
+
+    class Meta:
+        abstract = True
+
+
 class PublishedCreatedModel(CreatedModel):
     """
     Модель абстрактного класса Опубликовано с унаследованием
@@ -43,3 +55,77 @@ class PublishedCreatedModel(CreatedModel):
     class Meta:
         abstract = True
         ordering = ('-created_at',)
+
+
+class Job(CreatedModel):
+    """
+    Модель таблицы Фоновая задача.
+
+    Очередь хранится в основной базе: обработчик забирает ожидающие
+    задачи командой run_jobs, выполненные задачи удаляются.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    kind = models.CharField('Тип', max_length=64)
+    object_id = models.PositiveBigIntegerField('Объект')
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    claim = models.CharField('Метка обработчика', max_length=32, blank=True)
+    started_at = models.DateTimeField('Начата', null=True, blank=True)
+    error = models.TextField('Ошибка', blank=True)
+
+    class Meta(CreatedModel.Meta):
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = (
+            models.Index(
+                fields=('kind', 'object_id'),
+                condition=models.Q(status='pending'),
+                name='job_pending_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.kind}:{self.object_id}'
+
+
+class StoredFile(models.Model):
+    """
+    Модель таблицы Файл хранилища: число публикаций, ссылающихся на
+    файл из ContentAddressedStorage.
+    """
+
+    name = models.CharField('Имя файла', max_length=255, unique=True)
+    references = models.PositiveIntegerField('Ссылки', default=0)
+    released_at = models.DateTimeField(
+        'Последняя ссылка снята',
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = 'файл хранилища'
+        verbose_name_plural = 'Файлы хранилища'
+        indexes = (
+            models.Index(
+                fields=('released_at',),
+                condition=models.Q(references=0),
+                name='storedfile_orphan_idx',
+            ),
+        )
+
+    def __str__(self):
+        return self.name
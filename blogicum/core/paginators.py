@@ -0,0 +1,199 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from collections.abc import Sequence
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import (
+    EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator
+)
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def encode_cursor(obj):
+    """Кодирует ключ (pub_date, id) публикации в строку для URL."""
+    raw = f'{obj.pub_date.isoformat()}|{obj.pk}'.encode()
+    return urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Раскодирует курсор обратно в пару (pub_date, id)."""
+    try:
+        raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        pub_date, pk = raw.split('|')
+        return datetime.fromisoformat(pub_date), int(pk)
+    except (BinasciiError, UnicodeDecodeError, ValueError):
+        raise InvalidCursor('Некорректный курсор страницы')
+
+
+class OpenEndedPage(Page):
+    """Страница за пределом приблизительного итога."""
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Нумерованный пагинатор, кэширующий общее число записей ленты.
+
+    С `count_limit` считает записи не дальше заданного предела: для
+    очень больших лент итог становится приблизительным, а COUNT(*)
+    перестаёт обходить всю таблицу. Страницы за пределом при этом
+    остаются доступны: номер не ограничивается итогом, а следующая
+    страница есть, если после текущей нашлась ещё одна запись.
+    """
+
+    def __init__(self, object_list, per_page, cache_key=None,
+                 count_limit=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.count_limit = count_limit
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return self.count_rows()
+        total = cache.get(self.cache_key)
+        if total is None:
+            total = self.count_rows()
+            cache.set(
+                self.cache_key, total, settings.FEED_COUNT_CACHE_TIMEOUT
+            )
+        return total
+
+    @property
+    def is_count_approximate(self):
+        return self.count_limit is not None and self.count >= self.count_limit
+
+    def count_rows(self):
+        queryset = self.object_list.order_by()
+        if self.count_limit is not None:
+            queryset = queryset.values('pk')[:self.count_limit]
+        return queryset.count()
+
+    def validate_number(self, number):
+        if not self.is_count_approximate:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы должен быть целым числом')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+    def page(self, number):
+        if not self.is_count_approximate:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows:
+            raise EmptyPage('На странице нет записей')
+        has_more = len(rows) > self.per_page
+        # Известные на сейчас страницы: ссылки шаблонов и админки доходят
+        # до текущей и, если она не последняя, до следующей.
+        self.num_pages = max(self.num_pages, number + has_more)
+        return OpenEndedPage(rows[:self.per_page], number, self, has_more)
+
+
+class KeysetPage(Sequence):
+    """Страница ленты, выбранная по курсору, а не по смещению."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage after {self.previous_cursor}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Пагинатор ленты по ключу (pub_date, id).
+
+    Вместо OFFSET каждая страница начинается с условия на ключ последней
+    записи предыдущей страницы, поэтому глубокие страницы стоят столько
+    же, сколько первая, и не требуют COUNT(*).
+    """
+
+    ordering = ('-pub_date', '-pk')
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    def page(self, after=None, before=None):
+        """Возвращает страницу после курсора `after` или перед `before`."""
+        if before:
+            pub_date, pk = decode_cursor(before)
+            queryset = self.object_list.filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+            ).order_by('pub_date', 'pk')
+            rows = list(queryset[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return self._build_page(
+                rows,
+                has_next=bool(rows),
+                has_previous=has_more,
+            )
+        queryset = self.object_list.order_by(*self.ordering)
+        if after:
+            pub_date, pk = decode_cursor(after)
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            )
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return self._build_page(
+            rows,
+            has_next=has_more,
+            has_previous=bool(after) and bool(rows),
+        )
+
+    def _build_page(self, rows, has_next, has_previous):
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=encode_cursor(rows[-1]) if has_next else None,
+            previous_cursor=(
+                encode_cursor(rows[0]) if has_previous else None
+            ),
+        )
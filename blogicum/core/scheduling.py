@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.timezone import now
+
+from blog.models import Post
+from core.cache import FEED_FIELDS, invalidate_all_feeds, invalidate_post_feeds
+
+SCHEDULE_KEY = 'publication:schedule'
+
+
+def visible_condition(moment):
+    """Условие, при котором пост виден в лентах на момент `moment`."""
+    return Q(is_published=True, category__is_published=True,
+             pub_date__lte=moment)
+
+
+def refresh_visibility(queryset):
+    """Пересчитывает флаг is_visible постов двумя UPDATE."""
+    condition = visible_condition(now())
+    queryset.filter(condition, is_visible=False).update(is_visible=True)
+    queryset.filter(~condition, is_visible=True).update(is_visible=False)
+
+
+def publication_horizon():
+    """
+    Момент, до которого включительно посты считаются опубликованными.
+
+    В отличие от now() значение меняется только тогда, когда наступает
+    время очередной отложенной публикации, поэтому запросы лент между
+    публикациями одинаковы и их результаты можно кэшировать.
+    """
+    schedule = cache.get(SCHEDULE_KEY)
+    if schedule is None or is_due(schedule['next'], now()):
+        schedule = advance_schedule(schedule)
+    return schedule['horizon']
+
+
+def next_publication():
+    """Время ближайшей отложенной публикации или None."""
+    publication_horizon()
+    return cache.get(SCHEDULE_KEY, {}).get('next')
+
+
+def is_due(moment, current):
+    return moment is not None and moment <= current
+
+
+def advance_schedule(schedule=None):
+    """
+    Сдвигает горизонт публикации на текущий момент: открывает посты,
+    время которых наступило, и сбрасывает кэши их лент.
+    """
+    current = now()
+    Post.objects.filter(
+        visible_condition(current), is_visible=False
+    ).update(is_visible=True)
+    if schedule is None:
+        # Прежний горизонт потерян: неизвестно, какие посты вышли.
+        invalidate_all_feeds()
+    else:
+        invalidate_post_feeds(Post.objects.filter(
+            pub_date__gt=schedule['horizon'], pub_date__lte=current
+        ).values(*FEED_FIELDS))
+    schedule = {
+        'horizon': current,
+        'next': Post.objects.filter(
+            is_visible=False, is_published=True, pub_date__gt=current
+        ).order_by('pub_date').values_list('pub_date', flat=True).first(),
+    }
+    cache.set(SCHEDULE_KEY, schedule, None)
+    return schedule
+
+
+def schedule_publication(pub_date):
+    """Учитывает дату публикации сохранённого поста в расписании."""
+    schedule = cache.get(SCHEDULE_KEY)
+    if schedule is None or pub_date <= schedule['horizon']:
+        return
+    if pub_date <= now():
+        advance_schedule(schedule)
+    elif schedule['next'] is None or pub_date < schedule['next']:
+        cache.set(SCHEDULE_KEY, {**schedule, 'next': pub_date}, None)
@@ -0,0 +1,229 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+# Проиндексированные таблицы: столбцы и их веса в ранжировании bm25.
+# author_id индексируется для отбора по автору и в ранге не участвует;
+# сниппет строится по последнему столбцу.
+SEARCH_INDEXES = {
+    'blog_post': (('author_id', 0.0), ('title', 5.0), ('text', 1.0)),
+    'blog_comment': (('author_id', 0.0), ('text', 1.0)),
+}
+AUTHOR_COLUMN = 'author_id'
+# Маркеры совпадений в сниппете заменяются тегами после экранирования.
+MATCH_START, MATCH_END = '\x02', '\x03'
+SNIPPET_TOKENS = 24
+# Слово запроса с этим символом в начале - префикс имени автора.
+AUTHOR_MARK = '@'
+# Верхняя граница для диапазона username >= префикс < префикс + MAX_CHAR.
+MAX_CHAR = '\U0010ffff'
+
+
+def fts_table(table):
+    return f'{table}_fts'
+
+
+def search_schema(table):
+    """
+    Таблица FTS5 с внешним содержимым `table` и триггеры, которые
+    поддерживают её при INSERT, UPDATE и DELETE, в том числе групповых.
+    """
+    fts = fts_table(table)
+    columns = [column for column, weight in SEARCH_INDEXES[table]]
+    names = ', '.join(columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    return (
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {names}, content='{table}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_insert
+        AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_delete
+        AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {names})
+            VALUES ('delete', old.id, {old});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_update
+        AFTER UPDATE OF {names} ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {names})
+            VALUES ('delete', old.id, {old});
+            INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});
+        END""",
+    )
+
+
+def install_search(connection, table, rebuild=False):
+    """
+    Создаёт индекс FTS5 таблицы `table` и его триггеры.
+
+    Пересоздание таблицы миграцией удаляет её триггеры, поэтому функция
+    вызывается и после каждого migrate.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    fts = fts_table(table)
+    with connection.cursor() as cursor:
+        for statement in search_schema(table):
+            cursor.execute(statement)
+        if rebuild:
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def uninstall_search(connection, table):
+    if connection.vendor != 'sqlite':
+        return
+    fts = fts_table(table)
+    with connection.cursor() as cursor:
+        for action in ('insert', 'delete', 'update'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{action}')
+        cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+def match_expression(query, prefix=True):
+    """
+    Выражение MATCH из слов запроса: все слова обязательны. Слово со
+    звёздочкой на конце ищется как префикс, при `prefix` - и последнее.
+    Остальные операторы FTS5 из запроса не передаются.
+
+    Префикс FTS5 собирает в памяти все совпадения, поэтому на больших
+    таблицах точное слово с LIMIT заметно дешевле.
+    """
+    words = re.findall(r'(\w+)(\*?)', query)
+    if not words:
+        return None
+    terms = [f'"{word}"{star}' for word, star in words]
+    if prefix and not words[-1][1]:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def index_query(table, query, prefix=True, author_ids=()):
+    """
+    Выражение MATCH для индекса `table`: слова запроса ищутся только в
+    столбцах текста, а `author_ids` отбирает записи этих авторов по
+    столбцу author_id того же индекса.
+    """
+    words = match_expression(query, prefix)
+    if words is None:
+        return None
+    columns = ' '.join(
+        column for column, weight in SEARCH_INDEXES[table]
+        if column != AUTHOR_COLUMN
+    )
+    expression = f'{{{columns}}} : ({words})'
+    if author_ids:
+        ids = ' OR '.join(f'"{pk}"' for pk in author_ids)
+        expression += f' AND {AUTHOR_COLUMN} : ({ids})'
+    return expression
+
+
+def split_search_term(search_term):
+    """Текст запроса и префиксы имён авторов, отмеченные @."""
+    words, authors = [], []
+    for word in search_term.split():
+        if word.startswith(AUTHOR_MARK) and len(word) > 1:
+            authors.append(word[1:])
+        else:
+            words.append(word)
+    return ' '.join(words), authors
+
+
+def username_prefixes(prefixes):
+    """
+    Условие на имена пользователей, начинающиеся с одного из `prefixes`.
+
+    Диапазон вместо LIKE: LIKE в SQLite не различает регистр и поэтому
+    не использует индекс auth_user.username.
+    """
+    condition = Q()
+    for prefix in prefixes:
+        condition |= Q(username__gte=prefix, username__lt=prefix + MAX_CHAR)
+    return condition
+
+
+def matching_ids(model, query, limit=None, prefix=True, author_ids=()):
+    """
+    Подзапрос id объектов `model`, найденных в индексе, для pk__in.
+
+    Условие на авторов `author_ids` проверяет сам индекс, поэтому `limit`
+    относится к совпадениям обоих условий. С `limit` берутся только
+    столько новейших совпадений: FTS5 отдаёт их в порядке rowid и
+    останавливается, набрав нужное число.
+    """
+    table = model._meta.db_table
+    fts = fts_table(table)
+    sql = f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s'
+    params = [index_query(table, query, prefix, author_ids)]
+    if limit is not None:
+        sql += ' ORDER BY rowid DESC LIMIT %s'
+        params.append(limit)
+    return RawSQL(sql, params)
+
+
+def search(queryset, query):
+    """
+    Объекты из `queryset`, найденные по запросу, от самых релевантных:
+    `search_rank` - bm25 с весами столбцов.
+
+    Ранги всех совпадений считаются один раз в материализованном CTE
+    (SQLite 3.35+): bm25 в подзапросе на каждую строку заново читает
+    весь список совпадений слова.
+    """
+    model = queryset.model
+    table = model._meta.db_table
+    match = index_query(table, query)
+    if match is None:
+        return queryset.none()
+    fts = fts_table(table)
+    weights = ', '.join(
+        str(weight) for column, weight in SEARCH_INDEXES[table]
+    )
+    return queryset.filter(pk__in=matching_ids(model, query)).annotate(
+        search_rank=RawSQL(
+            f'WITH ranked AS MATERIALIZED ('
+            f'SELECT rowid AS id, bm25({fts}, {weights}) AS rank '
+            f'FROM {fts} WHERE {fts} MATCH %s'
+            f') SELECT rank FROM ranked WHERE ranked.id = {table}.id',
+            (match,),
+        )
+    ).order_by('search_rank', '-pk')
+
+
+def snippets(model, query, ids):
+    """
+    Сниппеты последнего проиндексированного столбца по объектам `ids`
+    модели `model`: словарь id - сниппет. Строятся отдельным запросом
+    только для выводимой страницы, а не для всех совпадений.
+    """
+    table = model._meta.db_table
+    match = index_query(table, query)
+    if match is None or not ids:
+        return {}
+    fts = fts_table(table)
+    column = len(SEARCH_INDEXES[table]) - 1
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, snippet({fts}, {column}, '{MATCH_START}', "
+            f"'{MATCH_END}', ' … ', {SNIPPET_TOKENS}) FROM {fts} "
+            f"WHERE {fts} MATCH %s AND rowid IN ({placeholders})",
+            [match, *ids],
+        )
+        return dict(cursor.fetchall())
+
+
+def highlight(snippet):
+    """Экранированный сниппет, в котором совпадения выделены тегом mark."""
+    return mark_safe(
+        escape(snippet or '')
+        .replace(MATCH_START, '<mark>')
+        .replace(MATCH_END, '</mark>')
+    )
@@ -1,22 +1,213 @@
-from django.db.models import Count
+from functools import partial
+
+from django.db import connection, transaction
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils.timezone import now
 
+from blog.models import Category, Comment, Post
+from core.cache import (
+    FEED_FIELDS, invalidate_category_feeds, invalidate_pages,
+    invalidate_post_feeds, post_page_tags
+)
+from core.images import delete_variants
+from core.scheduling import (
+    publication_horizon, refresh_visibility, schedule_publication
+)
+from core.storage import release_files
+
+# Сколько значений передаётся в одно условие IN группового DELETE.
+DELETE_BATCH_SIZE = 500
+
+# Поля, которые выводит карточка поста в лентах.
+POST_CARD_FIELDS = (
+    'title',
+    'excerpt',
+    'pub_date',
+    'is_published',
+    'image',
+    'image_variants',
+    'comment_count',
+    'updated_at',
+    'author__username',
+    'location__name',
+    'location__is_published',
+    'category__slug',
+    'category__title',
+    'category__is_published',
+)
+
 
 def filter_publication(queryset):
-    return queryset.filter(
-        is_published=True,
-        pub_date__lte=now(),
-        category__is_published=True,
-    )
+    # Горизонт сдвигается до фильтрации, чтобы флаг is_visible успел
+    # открыть посты, время публикации которых уже наступило.
+    publication_horizon()
+    return queryset.filter(is_visible=True)
 
 
-def annotation_posts_number_comments(queryset):
+def select_related_posts(queryset):
     return queryset.select_related(
         'author',
         'location',
         'category',
     ).order_by(
         '-pub_date'
-    ).annotate(
-        comment_count=Count('comments')
     )
+
+
+def project_post_cards(queryset):
+    """
+    Оставляет в запросе ленты только колонки карточки поста: текст,
+    HTML текста и лишние поля автора, места и категории не загружаются.
+    """
+    return select_related_posts(queryset).only(
+        'author', 'location', 'category', *POST_CARD_FIELDS
+    )
+
+
+def recount_comments(queryset):
+    """Пересчитывает счётчик комментариев постов одним UPDATE."""
+    return queryset.update(comment_count=Coalesce(Subquery(
+        Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0))
+
+
+def publish_categories(queryset, is_published):
+    """
+    Публикует или снимает с публикации категории и пересчитывает
+    видимость их постов групповыми UPDATE без сохранения каждого поста.
+    """
+    updated_at = now()
+    with transaction.atomic():
+        categories = dict(queryset.values_list('pk', 'slug'))
+        posts = Post.objects.filter(category_id__in=categories)
+        tags = post_page_tags(posts.values(*FEED_FIELDS))
+        updated = Category.objects.filter(pk__in=categories).update(
+            is_published=is_published, updated_at=updated_at
+        )
+        refresh_visibility(posts)
+    invalidate_category_feeds(set(categories.values()), tags, updated_at)
+    return updated
+
+
+def selected_posts(queryset):
+    """
+    Посты выборки по списку id: условия выборки админки (публикация,
+    поиск) перестают совпадать после первого же UPDATE действия.
+    """
+    return Post.objects.filter(
+        pk__in=list(queryset.values_list('pk', flat=True))
+    )
+
+
+def publish_posts(queryset, is_published):
+    """
+    Публикует или снимает с публикации посты одним UPDATE, пересчитывает
+    их видимость и один раз сбрасывает затронутые ленты.
+    """
+    updated_at = now()
+    with transaction.atomic():
+        posts = selected_posts(queryset)
+        rows = list(posts.values(*FEED_FIELDS))
+        updated = posts.update(
+            is_published=is_published, updated_at=updated_at
+        )
+        refresh_visibility(posts)
+        scheduled = posts.filter(
+            is_visible=False, is_published=True, pub_date__gt=updated_at
+        ).aggregate(first=Min('pub_date'))['first']
+    if scheduled:
+        schedule_publication(scheduled)
+    invalidate_post_feeds(rows, updated_at)
+    return updated
+
+
+def move_posts(queryset, category):
+    """Переносит посты в категорию `category` одним UPDATE."""
+    updated_at = now()
+    with transaction.atomic():
+        posts = selected_posts(queryset)
+        rows = list(posts.values(*FEED_FIELDS))
+        updated = posts.update(category=category, updated_at=updated_at)
+        refresh_visibility(posts)
+        rows += posts.values(*FEED_FIELDS)
+    invalidate_post_feeds(rows, updated_at)
+    return updated
+
+
+def delete_rows(model, column, values):
+    """
+    Удаляет строки таблицы `model`, у которых `column` среди `values`,
+    запросами DELETE по DELETE_BATCH_SIZE значений - без загрузки объектов
+    и сигналов на каждую строку. Триггеры базы (поисковый индекс)
+    срабатывают как обычно. Возвращает число удалённых строк.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(column)
+    values = list(values)
+    deleted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(values), DELETE_BATCH_SIZE):
+            batch = values[start:start + DELETE_BATCH_SIZE]
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(
+                f'DELETE FROM {table} WHERE {column} IN ({placeholders})',
+                batch,
+            )
+            deleted += cursor.rowcount
+    return deleted
+
+
+def delete_posts(queryset):
+    """
+    Удаляет посты и их комментарии групповыми DELETE без загрузки
+    объектов и сигналов на каждую строку: снимает ссылки на изображения
+    и удаляет их копии после фиксации транзакции.
+    """
+    with transaction.atomic():
+        posts = selected_posts(queryset)
+        rows = list(posts.values(*FEED_FIELDS, 'image', 'image_variants'))
+        ids = [row['pk'] for row in rows]
+        delete_rows(Comment, Comment._meta.get_field('post').column, ids)
+        deleted = delete_rows(Post, Post._meta.pk.column, ids)
+        release_files(row['image'] for row in rows if row['image'])
+        transaction.on_commit(partial(
+            delete_posts_variants, [row['image_variants'] for row in rows]
+        ))
+    invalidate_post_feeds(rows)
+    return deleted
+
+
+def delete_posts_variants(variants):
+    for item in variants:
+        delete_variants(item)
+
+
+def delete_comments(queryset):
+    """
+    Удаляет комментарии групповыми DELETE, пересчитывает счётчики их
+    постов одним UPDATE и один раз сбрасывает страницы этих постов.
+    """
+    with transaction.atomic():
+        rows = list(queryset.values_list('pk', 'post_id'))
+        posts = Post.objects.filter(
+            pk__in={post_id for _, post_id in rows}
+        )
+        deleted = delete_rows(
+            Comment, Comment._meta.pk.column, [pk for pk, _ in rows]
+        )
+        recount_comments(posts)
+        tags = post_page_tags(posts.values(*FEED_FIELDS))
+    invalidate_pages(tags)
+    return deleted
+
+
+def save_image_variants(post_id, variants):
+    """Сохраняет описание копий изображения поста и сбрасывает его ленты."""
+    posts = Post.objects.filter(pk=post_id)
+    posts.update(image_variants=variants, updated_at=now())
+    invalidate_post_feeds(posts.values(*FEED_FIELDS))
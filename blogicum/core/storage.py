@@ -0,0 +1,100 @@
+import os
+from collections import Counter, defaultdict
+from hashlib import sha256
+from pathlib import PurePosixPath
+from uuid import uuid4
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils.deconstruct import deconstructible
+from django.utils.timezone import now
+
+from core.models import StoredFile
+
+
+def shard_path(directory, digest, suffix=''):
+    """Путь с двумя уровнями подкаталогов по первым символам хэша."""
+    return f'{directory}/{digest[:2]}/{digest[2:4]}/{digest}{suffix}'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище, в котором имя файла - SHA-256 его содержимого, разложенный
+    по подкаталогам: posts_images/ab/cd/abcd….jpg.
+
+    Одинаковые загрузки получают одно имя и хранятся один раз; ссылки
+    на файл считает модель StoredFile, а удаляет файлы команда
+    collect_images. Ссылку на загруженный файл берёт само хранилище,
+    до проверки, что файл уже есть: иначе сборщик мог бы удалить его
+    между проверкой и сохранением записи.
+    """
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        path = PurePosixPath(name)
+        name = shard_path(
+            path.parent, digest.hexdigest(), path.suffix.lower()
+        )
+        with transaction.atomic():
+            # collect_images удаляет запись и файл в одной транзакции,
+            # поэтому после retain_file() файл либо есть, либо уже удалён
+            # и записывается заново.
+            retain_file(name)
+            if self.exists(name):
+                return name
+            # Файл пишется под временным именем и переименовывается: при
+            # одновременной загрузке одинакового файла побеждает любой.
+            temporary = super()._save(f'{name}.{uuid4().hex}.tmp', content)
+            os.replace(self.path(temporary), self.path(name))
+        return name
+
+
+def post_image_storage():
+    return ContentAddressedStorage()
+
+
+def retain_file(name):
+    """Учитывает новую ссылку на файл хранилища."""
+    files = StoredFile.objects.filter(name=name)
+    if files.update(references=F('references') + 1):
+        return
+    try:
+        with transaction.atomic():
+            StoredFile.objects.create(name=name, references=1)
+    except IntegrityError:
+        # Запись одновременно создал другой запрос.
+        files.update(references=F('references') + 1)
+
+
+def release_file(name):
+    """
+    Снимает ссылку на файл. Файл без ссылок удалит collect_images, когда
+    пройдёт время ожидания.
+    """
+    StoredFile.objects.filter(name=name, references__gt=0).update(
+        references=F('references') - 1, released_at=now()
+    )
+
+
+def release_files(names):
+    """
+    Снимает по ссылке за каждое вхождение имени в `names`: одним UPDATE
+    на каждое встречающееся число ссылок, а не на каждый файл.
+    """
+    groups = defaultdict(list)
+    for name, count in Counter(names).items():
+        groups[count].append(name)
+    for count, group in groups.items():
+        StoredFile.objects.filter(name__in=group, references__gt=0).update(
+            references=Greatest(F('references') - count, 0),
+            released_at=now(),
+        )
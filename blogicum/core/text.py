@@ -0,0 +1,38 @@
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+from core.consts import EXCERPT_WORDS, MAX_LENGTH
+
+
+def make_excerpt(text):
+    """
+    Анонс текста, как его выводит фильтр truncatewords в ленте, но не
+    длиннее поля анонса.
+    """
+    excerpt = Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    return Truncator(excerpt).chars(MAX_LENGTH)
+
+
+def render_text(text):
+    """Экранированный текст с переносами строк, как фильтр linebreaksbr."""
+    return linebreaksbr(text, autoescape=True)
+
+
+def fill_rendered_text(posts, batch_size):
+    """
+    Заполняет анонс и HTML текста постов пакетами по первичному ключу.
+    Принимает и историческую модель из миграций.
+    """
+    last_pk, total = 0, 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk).order_by('pk').only(
+            'pk', 'text'
+        )[:batch_size])
+        if not batch:
+            return total
+        for post in batch:
+            post.excerpt = make_excerpt(post.text)
+            post.text_html = render_text(post.text)
+        posts.model.objects.bulk_update(batch, ('excerpt', 'text_html'))
+        last_pk = batch[-1].pk
+        total += len(batch)
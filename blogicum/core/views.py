@@ -0,0 +1,172 @@
+import mimetypes
+import os
+import re
+from stat import S_ISREG
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied, SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse
+)
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from PIL import Image, UnidentifiedImageError
+
+from core.images import resize_allowed, resized_image
+
+MEDIA_PREFIX = 'posts_images'
+# Имена из ContentAddressedStorage и копий изображений содержат SHA-256
+# содержимого: файл под таким именем никогда не меняется, как и его
+# уменьшенные версии.
+HASHED_NAME = re.compile(r'(^|/)[0-9a-f]{64}[^/]*$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+@require_safe
+def serve_media(request, path):
+    """Отдаёт файл изображения публикации из MEDIA_ROOT/posts_images."""
+    name = f'{MEDIA_PREFIX}/{path}'
+    return send_media_file(request, name, bool(HASHED_NAME.search(name)))
+
+
+@require_safe
+def resize_image(request, width, path):
+    """
+    Отдаёт изображение публикации, уменьшенное до ширины `width`.
+
+    Разрешены ширины из IMAGE_RESIZE_WIDTHS, остальные - только по
+    подписанной ссылке из resize_url(). Результат хранится в дисковом
+    кэше и при следующих запросах отдаётся из него.
+    """
+    if not path.startswith(f'{MEDIA_PREFIX}/'):
+        raise Http404('Файл не найден')
+    if not resize_allowed(path, width, request.GET.get('s', '')):
+        raise PermissionDenied('Недопустимая ширина изображения')
+    try:
+        name = resized_image(path, width)
+    except (SuspiciousFileOperation, OSError, UnidentifiedImageError,
+            Image.DecompressionBombError):
+        raise Http404('Файл не найден')
+    return send_media_file(request, name, bool(HASHED_NAME.search(path)))
+
+
+def send_media_file(request, name, immutable):
+    """
+    Отдаёт файл `name` из MEDIA_ROOT с ETag, Last-Modified,
+    Cache-Control и поддержкой запросов диапазона байтов.
+
+    При MEDIA_SENDFILE_HEADER файл передаёт фронтовой прокси
+    (X-Accel-Redirect у nginx, X-Sendfile у Apache), а процесс Django
+    только проверяет запрос и ставит заголовки.
+    """
+    try:
+        full_path = default_storage.path(name)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404('Файл не найден')
+    if not S_ISREG(stat.st_mode):
+        raise Http404('Файл не найден')
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        content_type = mimetypes.guess_type(name)[0]
+        header = settings.MEDIA_SENDFILE_HEADER
+        if header:
+            response = HttpResponse(content_type=content_type)
+            # nginx раскодирует адрес внутреннего перенаправления, а в
+            # заголовок нельзя записать не-latin-1 символы.
+            response[header] = (
+                settings.MEDIA_ACCEL_PREFIX + quote(name)
+                if header == 'X-Accel-Redirect' else full_path
+            )
+        else:
+            response = file_response(
+                request, full_path, stat.st_size, content_type,
+                etag, last_modified,
+            )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = (
+        IMMUTABLE if immutable
+        else f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+    )
+    return response
+
+
+def file_response(request, full_path, size, content_type, etag,
+                  last_modified):
+    """Весь файл или один запрошенный диапазон байтов."""
+    byte_range = requested_range(request, size, etag, last_modified)
+    if byte_range is None:
+        return FileResponse(open(full_path, 'rb'), content_type=content_type)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        read_range(full_path, start, end - start + 1),
+        status=206,
+        content_type=content_type,
+    )
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = end - start + 1
+    return response
+
+
+def requested_range(request, size, etag, last_modified):
+    """
+    Диапазон (начало, конец) из заголовка Range, None - отдать весь файл,
+    False - диапазон невыполним. Несколько диапазонов не поддерживаются:
+    на них отдаётся весь файл, что допускает RFC 7233.
+    """
+    header = request.META.get('HTTP_RANGE')
+    if not header or not if_range_matches(request, etag, last_modified):
+        return None
+    match = RANGE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Суффикс: последние `last` байтов файла.
+        if not int(last):
+            return False
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return False
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def if_range_matches(request, etag, last_modified):
+    """Условие If-Range: диапазон отдаётся, только пока файл не изменился."""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def read_range(full_path, offset, length):
+    with open(full_path, 'rb') as file:
+        file.seek(offset)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
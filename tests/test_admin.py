@@ -0,0 +1,107 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+# Наибольшее число запросов на список раздела: сессия и пользователь,
+# id найденных авторов, подсчёт строк, сами строки и выбранные в
+# фильтрах объекты.
+CHANGELIST_BUDGETS = (
+    ('/admin/blog/category/', {}, 5),
+    ('/admin/blog/location/', {}, 5),
+    ('/admin/blog/post/', {}, 4),
+    ('/admin/blog/post/', {'q': 'пост @user'}, 5),
+    ('/admin/blog/post/', {'author__id__exact': 1, 'category__id__exact': 1,
+                           'location__id__exact': 1}, 7),
+    ('/admin/blog/comment/', {}, 4),
+    ('/admin/blog/comment/', {'post__id__exact': 1, 'author__id__exact': 1},
+     6),
+)
+
+
+def changelist_queries(client, url, params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    assert response.status_code == HTTPStatus.OK
+    return queries.captured_queries
+
+
+@pytest.mark.parametrize('url, params, budget', CHANGELIST_BUDGETS)
+def test_changelist_query_budget(
+        admin_client, mixer, user, published_category,
+        published_location, url, params, budget):
+    def blend(count):
+        posts = mixer.cycle(count).blend(
+            'blog.Post', author=user, category=published_category,
+            location=published_location, title='Новый пост',
+        )
+        for post in posts:
+            mixer.blend('blog.Comment', post=post, author=user)
+        mixer.cycle(count).blend('blog.Category')
+        mixer.cycle(count).blend('blog.Location')
+
+    blend(2)
+    first = changelist_queries(admin_client, url, params)
+    blend(10)
+    queries = changelist_queries(admin_client, url, params)
+    assert len(queries) == len(first)
+    assert len(queries) <= budget, '\n'.join(q['sql'] for q in queries)
+    for query in queries:
+        # Ни перебора значений фильтром или датами date_hierarchy, ни
+        # списка всех пользователей.
+        assert not re.search(r'\bDISTINCT\b', query['sql'], re.IGNORECASE)
+        assert not re.search(r'django_date(time)?_trunc', query['sql'])
+        assert not re.search(r'FROM "auth_user"(?!( U0)? WHERE)', query['sql'])
+
+
+def test_autocomplete_filters(
+        admin_client, mixer, user, post_with_published_location):
+    post = post_with_published_location
+    post.title = 'Скворцы прилетели'
+    post.save()
+    response = admin_client.get(
+        '/admin/blog/comment/', {'post__id__exact': post.pk}
+    )
+    content = response.content.decode()
+    assert 'js/autocomplete_filter.js' in content
+    assert 'data-field-name="post"' in content
+    assert f'<option value="{post.pk}" selected>' in content
+    response = admin_client.get('/admin/autocomplete/', {
+        'app_label': 'blog', 'model_name': 'comment', 'field_name': 'post',
+        'term': 'скворц',
+    })
+    assert [item['id'] for item in response.json()['results']] == [
+        str(post.pk)
+    ]
+
+
+@pytest.mark.parametrize('model, url', (
+    (Post, '/admin/blog/post/'),
+    (Comment, '/admin/blog/comment/'),
+))
+@override_settings(ADMIN_COUNT_LIMIT=3)
+def test_changelist_pages_past_count_limit(
+        admin_client, mixer, user, post_with_published_location, model,
+        url, monkeypatch):
+    mixer.cycle(6).blend(
+        'blog.Post', author=user, category=post_with_published_location.
+        category
+    )
+    mixer.cycle(7).blend(
+        'blog.Comment', post=post_with_published_location, author=user
+    )
+    monkeypatch.setattr(site._registry[model], 'list_per_page', 2)
+    oldest = model.objects.order_by('pk').first()
+    response = admin_client.get(url, {'p': 4})
+    assert response.status_code == HTTPStatus.OK
+    assert list(response.context['cl'].result_list) == [oldest]
+    assert '?p=5' not in response.content.decode()
+    assert admin_client.get(url, {'p': 5}).status_code == HTTPStatus.FOUND
@@ -0,0 +1,119 @@
+from unittest import mock
+
+import pytest
+from django.contrib import admin
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Location, Post
+from core.mixins import BulkDeleteAdminMixin
+from core.search import search
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def blend_posts(mixer, user, published_category):
+    def blend(count):
+        posts = mixer.cycle(count).blend(
+            'blog.Post', author=user, category=published_category,
+            title='Скворцы',
+        )
+        for post in posts:
+            mixer.cycle(2).blend('blog.Comment', post=post, author=user)
+        return posts
+    return blend
+
+
+def run_action(client, url, action, objects, **data):
+    """Выполняет действие админки: число запросов и сбросов страниц."""
+    data.update(
+        action=action, _selected_action=[obj.pk for obj in objects]
+    )
+    # Тип содержимого для журнала админки кэшируется после первого запроса.
+    ContentType.objects.get_for_models(Post, Comment)
+    with mock.patch.object(cache, 'set_many', wraps=cache.set_many) as spy, \
+            CaptureQueriesContext(connection) as queries:
+        response = client.post(url, data)
+    assert response.status_code == 302
+    invalidations = [
+        call for call in spy.call_args_list
+        if any(key.startswith('page_tag:') for key in call.args[0])
+    ]
+    return len(queries.captured_queries), len(invalidations)
+
+
+@pytest.mark.parametrize('action, is_published', (
+    ('unpublish', False),
+    ('publish', True),
+))
+def test_publish_actions_are_set_based(
+        admin_client, blend_posts, action, is_published):
+    small, large = blend_posts(2), blend_posts(10)
+    Post.objects.update(is_published=not is_published)
+    counts = [
+        run_action(admin_client, '/admin/blog/post/', action, posts)
+        for posts in (small, large)
+    ]
+    assert counts[0] == counts[1]
+    assert counts[0][1] == 1
+    for post in Post.objects.all():
+        assert post.is_published is is_published
+        assert post.is_visible is is_published
+
+
+def test_move_to_category(admin_client, blend_posts, mixer):
+    posts = blend_posts(3)
+    hidden = mixer.blend('blog.Category', is_published=False)
+    queries, invalidations = run_action(
+        admin_client, '/admin/blog/post/', 'move_to_category', posts,
+        category=hidden.pk,
+    )
+    assert invalidations == 1
+    assert set(Post.objects.values_list('category', 'is_visible')) == {
+        (hidden.pk, False)
+    }
+
+
+def test_delete_posts_with_comments(admin_client, blend_posts):
+    small, large, kept = blend_posts(2), blend_posts(10), blend_posts(1)
+    counts = [
+        run_action(
+            admin_client, '/admin/blog/post/', 'delete_selected', posts,
+            post='yes',
+        )
+        for posts in (small, large)
+    ]
+    assert counts[0] == counts[1]
+    assert counts[0][1] == 1
+    assert list(Post.objects.all()) == kept
+    assert Comment.objects.count() == 2
+    assert list(search(Post.objects.all(), 'скворцы')) == kept
+
+
+def test_delete_comments_updates_counters(admin_client, blend_posts):
+    first, second = blend_posts(2)
+    comments = list(Comment.objects.filter(post=first)) + [
+        Comment.objects.filter(post=second).first()
+    ]
+    queries, invalidations = run_action(
+        admin_client, '/admin/blog/comment/', 'delete_selected', comments,
+        post='yes',
+    )
+    assert invalidations == 1
+    assert dict(Post.objects.values_list('pk', 'comment_count')) == {
+        first.pk: 0, second.pk: 1,
+    }
+
+
+def test_bulk_delete_mixin_defaults_to_queryset_delete(rf, mixer):
+    class LocationAdmin(BulkDeleteAdminMixin, admin.ModelAdmin):
+        pass
+
+    kept, *deleted = mixer.cycle(3).blend('blog.Location')
+    LocationAdmin(Location, admin.site).delete_queryset(
+        rf.post('/'), Location.objects.filter(pk__in=[o.pk for o in deleted])
+    )
+    assert list(Location.objects.all()) == [kept]
@@ -0,0 +1,32 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        user_client, another_user, mixer, post_with_published_location):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Текст'})
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+    own_comment = post.comments.get()
+    mixer.cycle(2).blend('blog.Comment', post=post, author=another_user)
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+    user_client.post(f'/posts/{post.id}/delete_comment/{own_comment.id}/')
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+
+def test_rebuild_comment_counts(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    type(post).objects.update(comment_count=42)
+
+    call_command('rebuild_comment_counts', batch_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 3
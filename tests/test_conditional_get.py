@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_unchanged_pages_answer_not_modified(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    for url in ('/', f'/posts/{post.id}/'):
+        response = client.get(url)
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert not queries.captured_queries
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    etag = client.get(f'/posts/{post.id}/')['ETag']
+    mixer.blend('blog.Comment', post=post)
+    response = client.get(f'/posts/{post.id}/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+def test_authenticated_users_get_fresh_pages(
+        client, user_client, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    etag = client.get(url)['ETag']
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert not response.has_header('ETag')
+
+
+def test_missing_post_has_no_validators(client):
+    response = client.get('/posts/404/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert not response.has_header('ETag')
+
+
+def test_updated_at_is_tracked(post_with_published_location):
+    category = post_with_published_location.category
+    for obj in (post_with_published_location, category):
+        updated_at = obj.updated_at
+        obj.save()
+        obj.refresh_from_db()
+        assert obj.updated_at > updated_at
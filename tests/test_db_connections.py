@@ -0,0 +1,48 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.core.signals import request_started
+from django.db import connection, connections
+
+from core.db import connection_opens, record_connection_open
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_connection_opens_are_counted_per_minute():
+    before = connection_opens(1)[0][1]
+    record_connection_open(sender=connection.__class__, connection=connection)
+    assert connection_opens(1)[0][1] == before + 1
+    assert len(connection_opens(5)) == 5
+
+
+def test_metrics_never_break_connections():
+    with mock.patch.object(cache, 'incr', side_effect=ValueError):
+        record_connection_open(
+            sender=connection.__class__, connection=connection
+        )
+
+
+def test_stats_need_shared_cache():
+    with pytest.raises(CommandError):
+        call_command('db_connection_stats')
+
+
+@pytest.mark.parametrize('is_open, usable, closed', (
+    (True, True, False),
+    (True, False, True),
+    (False, False, False),
+))
+def test_broken_connections_are_closed(is_open, usable, closed):
+    reused = mock.Mock(
+        connection=object() if is_open else None,
+        in_atomic_block=False,
+        settings_dict={'CONN_HEALTH_CHECKS': True},
+    )
+    reused.is_usable.return_value = usable
+    with mock.patch.object(connections, 'all', return_value=[reused]):
+        request_started.send(sender=None)
+    assert reused.close.called is closed
+    assert reused.is_usable.called is is_open
@@ -0,0 +1,14 @@
+import pytest
+
+from blog.management.commands.explain_feeds import is_problem
+
+
+@pytest.mark.parametrize('detail, sorts, expected', (
+    ('SCAN blog_post', False, True),
+    ('SCAN blog_post USING INDEX post_visible_pub_date_idx', False, False),
+    ('SCAN blog_post USING INDEX post_visible_pub_date_idx', True, True),
+    ('USE TEMP B-TREE FOR ORDER BY', True, True),
+    ('SEARCH blog_post USING INTEGER PRIMARY KEY (rowid=?)', True, False),
+))
+def test_ordered_index_walks_are_not_problems(detail, sorts, expected):
+    assert is_problem(detail, sorts) is expected
@@ -0,0 +1,60 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    counts = [
+        query for query in queries.captured_queries
+        if 'COUNT(' in query['sql'] and 'blog_post' in query['sql']
+    ]
+    return response, len(counts)
+
+
+@override_settings(FEED_PAGINATION_MODE='numbered')
+def test_feed_count_is_cached_and_invalidated(
+        user_client, mixer, many_posts_with_published_locations):
+    response, n_counts = count_queries(user_client, '/')
+    assert n_counts == 1
+    assert response.context['paginator'].count == N_PER_PAGE * 2
+
+    response, n_counts = count_queries(user_client, '/')
+    assert n_counts == 0
+    assert response.context['paginator'].count == N_PER_PAGE * 2
+
+    post = many_posts_with_published_locations[0]
+    post.is_published = False
+    post.save()
+    response, n_counts = count_queries(user_client, '/')
+    assert n_counts == 1
+    assert response.context['paginator'].count == N_PER_PAGE * 2 - 1
+
+    post.category.is_published = False
+    post.category.save()
+    response, _ = count_queries(user_client, '/')
+    assert response.context['paginator'].count == 0
+
+
+@override_settings(FEED_PAGINATION_MODE='numbered', FEED_COUNT_LIMIT=15)
+def test_feed_count_limit(user_client, many_posts_with_published_locations):
+    paginator = user_client.get('/').context['paginator']
+    assert paginator.count == 15
+    assert paginator.is_count_approximate
+    # По приблизительному итогу ссылки на номера страниц не выводятся:
+    # на page=2 ведёт только ссылка на следующую страницу.
+    assert user_client.get('/').content.decode().count('page=2') == 1
+    oldest = min(many_posts_with_published_locations, key=lambda post: (
+        post.pub_date, post.pk
+    ))
+    page = user_client.get('/', {'page': 2}).context['page_obj']
+    assert len(page) == N_PER_PAGE
+    assert page[len(page) - 1] == oldest
+    assert not page.has_next()
+    assert user_client.get('/', {'page': 3}).status_code == 404
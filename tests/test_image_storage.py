@@ -0,0 +1,97 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import Post
+from core.models import StoredFile
+
+pytestmark = [pytest.mark.django_db]
+
+
+def uploaded_image(color='red'):
+    data = BytesIO()
+    Image.new('RGB', (20, 20), color).save(data, 'JPEG')
+    return SimpleUploadedFile(
+        'Upload.JPG', data.getvalue(), content_type='image/jpeg'
+    )
+
+
+def test_identical_uploads_share_one_file(mixer, user, published_category):
+    first, second = mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category,
+    )
+    for post in (first, second):
+        post.image = uploaded_image()
+        post.save()
+    name = first.image.name
+    assert name == second.image.name
+    directory, shard_1, shard_2, filename = name.split('/')
+    assert (directory, shard_1 + shard_2) == ('posts_images', filename[:4])
+    assert filename.endswith('.jpg')
+    assert StoredFile.objects.get(name=name).references == 2
+
+
+def test_upload_takes_reference_before_reusing_file(
+        mixer, user, published_category):
+    first, second = mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category,
+    )
+    first.image = uploaded_image()
+    first.save()
+    name = first.image.name
+    storage = Post._meta.get_field('image').storage
+    first.delete()
+    # Сборщик успел удалить файл без ссылок, но не его запись.
+    storage.delete(name)
+    second.image = uploaded_image()
+    second.save()
+    assert second.image.name == name
+    assert storage.exists(name)
+    assert StoredFile.objects.get(name=name).references == 1
+    call_command('collect_images', grace_hours=0)
+    assert storage.exists(name)
+
+
+def test_reupload_of_same_image_keeps_one_reference(
+        mixer, user, published_category):
+    post = mixer.blend('blog.Post', author=user, category=published_category)
+    for _ in range(2):
+        post.image = uploaded_image()
+        post.save()
+    name = post.image.name
+    assert StoredFile.objects.get(name=name).references == 1
+    post.delete()
+    call_command('collect_images', grace_hours=0)
+    assert not StoredFile.objects.filter(name=name).exists()
+    assert not Post._meta.get_field('image').storage.exists(name)
+
+
+def test_orphans_are_collected(mixer, user, published_category):
+    first, second = mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category,
+    )
+    for post in (first, second):
+        post.image = uploaded_image()
+        post.save()
+    shared = first.image.name
+    storage = Post._meta.get_field('image').storage
+
+    second.image = uploaded_image('blue')
+    second.save()
+    replaced = second.image.name
+    first.delete()
+    assert StoredFile.objects.get(name=shared).references == 0
+    call_command('collect_images', grace_hours=1)
+    assert storage.exists(shared)
+
+    call_command('collect_images', grace_hours=0)
+    assert not storage.exists(shared)
+    assert not StoredFile.objects.filter(name=shared).exists()
+    assert storage.exists(replaced)
+
+    second.delete()
+    call_command('collect_images', grace_hours=0)
+    assert not storage.exists(replaced)
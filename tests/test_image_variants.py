@@ -0,0 +1,63 @@
+from io import BytesIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.contrib.admin.sites import site
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import Post
+from core.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+
+def uploaded_image(size=(1000, 500)):
+    data = BytesIO()
+    Image.new('RGB', size).save(data, 'JPEG')
+    return SimpleUploadedFile(
+        'variants.jpg', data.getvalue(), content_type='image/jpeg'
+    )
+
+
+def test_upload_builds_variants(user_client, post_with_published_location):
+    post = post_with_published_location
+    post.image = uploaded_image()
+    post.save()
+    assert 'placeholder.svg' in user_client.get('/').content.decode()
+    call_command('run_jobs', once=True, workers=1)
+    assert not Job.objects.exists()
+    post.refresh_from_db()
+    variants = post.image_variants
+    assert variants['source'] == post.image.name
+    assert (variants['width'], variants['height']) == (1000, 500)
+    assert [size['width'] for size in variants['sizes']] == [320, 640]
+    for size in variants['sizes']:
+        with default_storage.open(size['webp']) as file:
+            assert Image.open(file).format == 'WEBP'
+
+    soup = BeautifulSoup(user_client.get('/').content, 'html.parser')
+    source = soup.find('source', type='image/webp')
+    assert '320w' in source['srcset'] and '640w' in source['srcset']
+    assert soup.find('img', srcset=True)['width'] == '1000'
+    thumbnail = default_storage.url(variants['sizes'][0]['fallback'])
+    assert thumbnail in site._registry[Post].image_tag(post)
+
+    previous = variants['sizes']
+    post.image = None
+    post.save()
+    assert post.image_variants == {}
+    assert not any(
+        default_storage.exists(size['webp']) for size in previous
+    )
+
+
+def test_backfill_command(post_with_published_location):
+    post = post_with_published_location
+    post.image = uploaded_image((200, 100))
+    post.save()
+    call_command('build_image_variants', workers=1)
+    post.refresh_from_db()
+    assert [size['width'] for size in post.image_variants['sizes']] == [200]
@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core import jobs
+from core.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_jobs_are_claimed_once():
+    jobs.enqueue('test', 1)
+    jobs.enqueue('test', 1)
+    jobs.enqueue('test', 2)
+    assert Job.objects.count() == 2
+    assert len(jobs.claim_jobs(limit=10)) == 2
+    assert jobs.claim_jobs(limit=10) == []
+
+
+def test_failed_job_is_retried(monkeypatch):
+    def fail(value):
+        raise ValueError(value)
+
+    monkeypatch.setitem(jobs.HANDLERS, 'test', (
+        lambda job: (job.object_id,), fail, lambda job, *args: None
+    ))
+    jobs.enqueue('test', 1)
+    with ThreadPoolExecutor(1) as pool:
+        for _ in range(jobs.MAX_ATTEMPTS):
+            assert jobs.run_jobs(pool, limit=1) == 1
+    job = Job.objects.get()
+    assert job.status == Job.FAILED
+    assert job.attempts == jobs.MAX_ATTEMPTS
+    assert 'ValueError' in job.error
+
+
+def test_bad_jobs_do_not_stop_the_batch(monkeypatch):
+    def broken(job):
+        raise ValueError(job.object_id)
+
+    monkeypatch.setitem(jobs.HANDLERS, 'broken', (
+        broken, str, lambda job, *args: None
+    ))
+    monkeypatch.setitem(jobs.HANDLERS, 'test', (
+        lambda job: (job.object_id,), str, lambda job, *args: None
+    ))
+    jobs.enqueue('unknown', 1)
+    jobs.enqueue('broken', 2)
+    jobs.enqueue('test', 3)
+    with ThreadPoolExecutor(1) as pool:
+        assert jobs.run_jobs(pool, limit=10) == 3
+    assert set(Job.objects.values_list('kind', 'status')) == {
+        ('unknown', Job.PENDING), ('broken', Job.PENDING)
+    }
+
+
+def test_replaced_image_discards_stale_variants(
+        monkeypatch, post_with_published_location):
+    post = post_with_published_location
+    deleted = []
+    monkeypatch.setattr(jobs, 'delete_variants', deleted.append)
+    stale = {'source': 'posts_images/old.jpg', 'sizes': []}
+    jobs.store_image_variants(
+        Job(object_id=post.pk), 'posts_images/old.jpg', stale
+    )
+    assert deleted == [stale]
+    post.refresh_from_db()
+    assert not post.image_ready
@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def lookup_queries(client, url, column):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, sum(
+        f'{column} = ' in query['sql'] for query in queries.captured_queries
+    )
+
+
+def test_category_is_resolved_once(
+        another_user_client, post_with_published_location):
+    category = post_with_published_location.category
+    url = f'/category/{category.slug}/'
+    _, n_queries = lookup_queries(
+        another_user_client, url, '"blog_category"."slug"'
+    )
+    assert n_queries == 1
+    _, n_queries = lookup_queries(
+        another_user_client, url, '"blog_category"."slug"'
+    )
+    assert n_queries == 0
+
+    category.is_published = False
+    category.save()
+    response = another_user_client.get(url)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_author_is_resolved_once(
+        another_user_client, user, post_with_published_location):
+    url = f'/profile/{user.username}/'
+    _, n_queries = lookup_queries(
+        another_user_client, url, '"auth_user"."username"'
+    )
+    assert n_queries == 1
+    _, n_queries = lookup_queries(
+        another_user_client, url, '"auth_user"."username"'
+    )
+    assert n_queries == 0
+    cached = cache.get(f'lookup:author:{user.username}')
+    assert cached.pk == user.pk
+    for private in ('password', 'email', 'is_active', 'is_superuser'):
+        assert private not in cached.__dict__
+
+    user.first_name = 'Новое'
+    user.last_name = 'Имя'
+    user.save()
+    response = another_user_client.get(url)
+    assert 'Новое Имя' in response.content.decode()
+
+
+def test_author_views_fetch_object_once(
+        user_client, user, mixer, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    for url, table in (
+        (f'/posts/{post.id}/edit/', 'blog_post'),
+        (f'/posts/{post.id}/delete/', 'blog_post'),
+        (f'/posts/{post.id}/edit_comment/{comment.id}/', 'blog_comment'),
+        (f'/posts/{post.id}/delete_comment/{comment.id}/', 'blog_comment'),
+    ):
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        selects = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith(f'SELECT "{table}"."id"')
+        ]
+        assert len(selects) == 1, url
+
+
+def test_comment_lookup_is_scoped_by_post(
+        user_client, user, mixer, post_with_published_location,
+        post_of_another_author):
+    comment = mixer.blend(
+        'blog.Comment', post=post_with_published_location, author=user
+    )
+    response = user_client.get(
+        f'/posts/{post_of_another_author.id}/edit_comment/{comment.id}/'
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND
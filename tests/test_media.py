@@ -0,0 +1,94 @@
+from http import HTTPStatus
+from urllib.parse import quote
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_file():
+    name = default_storage.save('posts_images/media_test.jpg',
+                                ContentFile(CONTENT))
+    yield name
+    default_storage.delete(name)
+
+
+def streamed(response):
+    return b''.join(response.streaming_content)
+
+
+def test_full_file_and_validators(client, media_file):
+    response = client.get(f'/{media_file}')
+    assert response.status_code == HTTPStatus.OK
+    assert streamed(response) == CONTENT
+    assert response['Accept-Ranges'] == 'bytes'
+    assert 'immutable' not in response['Cache-Control']
+    response = client.get(
+        f'/{media_file}', HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.parametrize('header, expected, content_range', (
+    ('bytes=0-9', CONTENT[:10], 'bytes 0-9/1024'),
+    ('bytes=1000-', CONTENT[1000:], 'bytes 1000-1023/1024'),
+    ('bytes=-4', CONTENT[-4:], 'bytes 1020-1023/1024'),
+    ('bytes=1020-5000', CONTENT[1020:], 'bytes 1020-1023/1024'),
+), ids=('closed', 'open', 'suffix', 'past-end'))
+def test_byte_ranges(client, media_file, header, expected, content_range):
+    response = client.get(f'/{media_file}', HTTP_RANGE=header)
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert streamed(response) == expected
+    assert response['Content-Range'] == content_range
+
+
+def test_unsatisfiable_and_stale_ranges(client, media_file):
+    response = client.get(f'/{media_file}', HTTP_RANGE='bytes=2000-')
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert response['Content-Range'] == 'bytes */1024'
+    response = client.get(
+        f'/{media_file}', HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"'
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_hashed_names_are_immutable(client):
+    name = default_storage.save(
+        f'posts_images/ab/cd/{"a" * 64}.jpg', ContentFile(CONTENT)
+    )
+    try:
+        response = client.get(f'/{name}')
+        assert 'immutable' in response['Cache-Control']
+    finally:
+        default_storage.delete(name)
+
+
+@override_settings(MEDIA_SENDFILE_HEADER='X-Accel-Redirect')
+def test_accel_redirect(client, media_file):
+    response = client.get(f'/{media_file}')
+    assert response['X-Accel-Redirect'] == f'/internal-media/{media_file}'
+    assert response.content == b''
+
+
+@override_settings(MEDIA_SENDFILE_HEADER='X-Accel-Redirect')
+def test_accel_redirect_quotes_name(client):
+    name = default_storage.save(
+        'posts_images/Фото 100%?.jpg', ContentFile(CONTENT)
+    )
+    try:
+        response = client.get(quote(f'/{name}'))
+        assert response['X-Accel-Redirect'] == (
+            '/internal-media/posts_images/'
+            '%D0%A4%D0%BE%D1%82%D0%BE%20100%25%3F.jpg'
+        )
+    finally:
+        default_storage.delete(name)
+
+
+def test_missing_and_outside_files(client):
+    assert client.get('/posts_images/missing.jpg').status_code == 404
+    assert client.get('/posts_images/../db.sqlite3').status_code == 404
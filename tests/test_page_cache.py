@@ -0,0 +1,48 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_pages_are_cached(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    urls = (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+        f'/posts/{post.id}/',
+    )
+    for url in urls:
+        assert client.get(url)['X-Page-Cache'] == 'MISS'
+        assert client.get(url)['X-Page-Cache'] == 'HIT'
+    assert client.get('/?page=1')['X-Page-Cache'] == 'MISS'
+
+    mixer.blend('blog.Comment', post=post)
+    for url in urls:
+        response = client.get(url)
+        assert response['X-Page-Cache'] == 'MISS'
+    assert '(1)' in client.get('/').content.decode()
+
+
+def test_page_cache_invalidated_by_related_changes(
+        client, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    client.get(url)
+    post.location.name = 'Новое место'
+    post.location.save()
+    response = client.get(url)
+    assert response['X-Page-Cache'] == 'MISS'
+    assert 'Новое место' in response.content.decode()
+
+    post.category.title = 'Новая категория'
+    post.category.save()
+    response = client.get(url)
+    assert response['X-Page-Cache'] == 'MISS'
+    assert 'Новая категория' in response.content.decode()
+
+
+def test_authenticated_pages_are_not_cached(
+        user_client, post_with_published_location):
+    assert 'X-Page-Cache' not in user_client.get('/')
+    assert 'X-Page-Cache' not in user_client.get('/')
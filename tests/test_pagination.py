@@ -0,0 +1,41 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(FEED_PAGINATION_MODE='keyset')
+def test_keyset_pagination(user_client, many_posts_with_published_locations):
+    first_page = user_client.get('/').context['page_obj']
+    assert len(first_page) == N_PER_PAGE
+    assert first_page.has_next() and not first_page.has_previous()
+
+    response = user_client.get(f'/?after={first_page.next_cursor}')
+    second_page = response.context['page_obj']
+    posts = list(first_page) + list(second_page)
+    assert len(posts) == len(many_posts_with_published_locations)
+    assert len({post.id for post in posts}) == len(posts)
+    pub_dates = [post.pub_date for post in posts]
+    assert pub_dates == sorted(pub_dates, reverse=True)
+    assert not second_page.has_next() and second_page.has_previous()
+
+    response = user_client.get(f'/?before={second_page.previous_cursor}')
+    assert list(response.context['page_obj']) == list(first_page)
+
+
+@override_settings(FEED_PAGINATION_MODE='keyset')
+def test_keyset_pagination_invalid_cursor(user_client):
+    response = user_client.get('/?after=not-a-cursor')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@override_settings(FEED_PAGINATION_MODE='numbered')
+def test_numbered_pagination(user_client, many_posts_with_published_locations):
+    response = user_client.get('/?page=2')
+    page = response.context['page_obj']
+    assert page.number == 2
+    assert len(page) == len(many_posts_with_published_locations) - N_PER_PAGE
@@ -0,0 +1,23 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_is_cached_by_revision(
+        user_client, mixer, post_with_published_location):
+    post = post_with_published_location
+    type(post).objects.filter(pk=post.pk).update(title='Старый заголовок')
+    assert 'Старый заголовок' in user_client.get('/').content.decode()
+
+    type(post).objects.filter(pk=post.pk).update(title='Без новой ревизии')
+    content = user_client.get('/').content.decode()
+    assert 'Старый заголовок' in content
+    assert 'Без новой ревизии' not in content
+
+    post.refresh_from_db()
+    post.title = 'Новый заголовок'
+    post.save()
+    assert 'Новый заголовок' in user_client.get('/').content.decode()
+
+    mixer.blend('blog.Comment', post=post)
+    assert 'Комментарии (1)' in user_client.get('/').content.decode()
@@ -0,0 +1,28 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.scheduling import publication_horizon
+
+pytestmark = [pytest.mark.django_db]
+
+
+def detail_queries(client, post):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f'/posts/{post.id}/')
+    assert response.status_code == 200
+    return len(queries)
+
+
+def test_post_detail_query_count_is_constant(
+        user_client, mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.blend('blog.Comment', post=post)
+    # Расписание публикаций вычисляется один раз на все запросы.
+    publication_horizon()
+    one_comment = detail_queries(user_client, post)
+
+    mixer.cycle(14).blend('blog.Comment', post=post)
+    assert detail_queries(user_client, post) == one_comment
+    # Сессия и пользователь, пост со связями, число и страница комментариев.
+    assert one_comment <= 5
@@ -0,0 +1,27 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_stores_excerpt_and_html(post_with_published_location):
+    post = post_with_published_location
+    post.text = ' '.join(['<b>слово</b>'] * 12) + '\nвторая строка'
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == ' '.join(['<b>слово</b>'] * 10) + ' …'
+    assert post.text_html.endswith('<br>вторая строка')
+    assert '<b>' not in post.text_html
+
+
+def test_feed_defers_text(user_client, post_with_published_location):
+    page = user_client.get('/').context['page_obj']
+    assert {'text', 'text_html'} <= page[0].get_deferred_fields()
+
+
+def test_backfill_post_text(post_with_published_location):
+    post = post_with_published_location
+    type(post).objects.update(excerpt='', text_html='')
+    call_command('backfill_post_text', batch_size=1)
+    post.refresh_from_db()
+    assert post.excerpt and post.text_html
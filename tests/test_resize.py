@@ -0,0 +1,111 @@
+import os
+import shutil
+from io import BytesIO
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from PIL import Image
+from PIL.JpegImagePlugin import JpegImageFile
+
+from core.images import resize_url, resized_image, trim_resize_cache
+
+# Уменьшенные версии отдаются под тем же префиксом MEDIA_URL, что и файлы.
+RESIZE = f'/{settings.MEDIA_URL.lstrip("/")}r'
+
+
+@pytest.fixture(autouse=True)
+def resize_cache_dir(settings, tmp_path):
+    settings.IMAGE_RESIZE_CACHE_DIR = f'cache/test-{tmp_path.name}'
+    yield
+    shutil.rmtree(
+        default_storage.path(settings.IMAGE_RESIZE_CACHE_DIR),
+        ignore_errors=True,
+    )
+
+
+@pytest.fixture
+def source():
+    data = BytesIO()
+    Image.new('RGB', (800, 400), 'green').save(data, 'JPEG')
+    name = default_storage.save(
+        f'posts_images/ab/cd/{"b" * 64}.jpg', ContentFile(data.getvalue())
+    )
+    yield name
+    default_storage.delete(name)
+
+
+def decoded(response):
+    return Image.open(BytesIO(b''.join(response.streaming_content)))
+
+
+@pytest.mark.django_db
+def test_allowed_width_is_resized_and_cached(client, source):
+    url = resize_url(source, 320)
+    assert url == f'{RESIZE}/320/{source}'
+    response = client.get(url)
+    assert response.status_code == 200
+    assert decoded(response).size == (320, 160)
+    assert 'immutable' in response['Cache-Control']
+
+    cached = default_storage.path(resized_image(source, 320))
+    os.utime(cached, (0, 0))
+    assert decoded(client.get(url)).size == (320, 160)
+    assert os.stat(cached).st_mtime > 0
+
+
+@pytest.mark.django_db
+def test_other_widths_need_signature(client, source):
+    assert client.get(f'{RESIZE}/333/{source}').status_code == 403
+    url = resize_url(source, 333)
+    assert '?s=' in url
+    assert decoded(client.get(url)).size == (333, 167)
+    assert client.get(url.replace('333', '334', 1)).status_code == 403
+    assert client.get(f'{RESIZE}/1920/{source}').status_code == 200
+    assert decoded(client.get(f'{RESIZE}/1920/{source}')).width == 800
+
+
+@pytest.mark.django_db
+def test_missing_source(client):
+    assert client.get(f'{RESIZE}/320/posts_images/missing.jpg').status_code \
+        == 404
+    assert client.get(f'{RESIZE}/320/other/file.jpg').status_code == 404
+
+
+def test_jpeg_is_decoded_at_reduced_scale(source):
+    with mock.patch.object(
+        JpegImageFile, 'draft', autospec=True,
+        side_effect=JpegImageFile.draft,
+    ) as draft:
+        resized_image(source, 160)
+    assert draft.call_args.args[1:] == ('RGB', (160, 80))
+
+
+def test_rotated_jpeg_keeps_requested_width():
+    data = BytesIO()
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new('RGB', (800, 400), 'green').save(data, 'JPEG', exif=exif)
+    name = default_storage.save(
+        f'posts_images/ab/cd/{"c" * 64}.jpg', ContentFile(data.getvalue())
+    )
+    try:
+        with default_storage.open(resized_image(name, 200)) as file:
+            assert Image.open(file).size == (200, 400)
+    finally:
+        default_storage.delete(name)
+
+
+def test_trim_removes_least_recently_used(source):
+    names = [resized_image(source, width) for width in (160, 320, 480)]
+    paths = [default_storage.path(name) for name in names]
+    for age, path in zip((100, 200, 300), paths):
+        os.utime(path, (0, age))
+    newest = os.path.getsize(paths[-1])
+    # Кэш обрезается до 90% предела: остаётся только последняя версия.
+    with override_settings(IMAGE_RESIZE_CACHE_MAX_BYTES=int(newest / 0.9)):
+        assert trim_resize_cache() == 2
+    assert [os.path.exists(path) for path in paths] == [False, False, True]
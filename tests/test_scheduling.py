@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from core import scheduling
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_scheduled_post_goes_live(
+        client, monkeypatch, mixer, user, published_category):
+    pub_date = timezone.now() + timedelta(hours=1)
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=pub_date,
+    )
+    response = client.get('/')
+    assert post not in response.context['page_obj']
+    assert client.get('/')['X-Page-Cache'] == 'HIT'
+    assert scheduling.next_publication() == pub_date
+
+    monkeypatch.setattr(
+        scheduling, 'now', lambda: pub_date + timedelta(seconds=1)
+    )
+    response = client.get('/')
+    assert response['X-Page-Cache'] == 'MISS'
+    assert post in response.context['page_obj']
+    assert scheduling.next_publication() is None
+
+
+def test_backdated_post_is_visible_at_once(
+        user_client, mixer, user, published_category):
+    assert len(user_client.get('/').context['page_obj']) == 0
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now(),
+    )
+    assert post in user_client.get('/').context['page_obj']
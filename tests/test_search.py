@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+from core.search import search
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    def blend(title, text, **kwargs):
+        return mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            title=title, text=text, **kwargs
+        )
+    return blend
+
+
+def test_results_are_ranked_with_snippets(client, posts):
+    in_text = posts('Заметки', 'Долгий рассказ про <b>скворцов</b> и зиму')
+    in_title = posts('Скворцы', 'Весна пришла')
+    posts('Другое', 'Ничего общего')
+    response = client.get('/search/', {'q': 'скворц'})
+    assert response.status_code == HTTPStatus.OK
+    found = list(response.context['page_obj'])
+    assert found == [in_title, in_text]
+    snippet = found[1].snippet_html
+    assert '<mark>скворцов</mark>' in snippet
+    assert '&lt;b&gt;' in snippet
+
+
+def test_search_respects_publication(client, posts):
+    posts('Скворцы', 'Черновик', is_published=False)
+    response = client.get('/search/', {'q': 'скворцы'})
+    assert not response.context['page_obj']
+    assert not client.get('/search/').context['page_obj']
+
+
+def test_search_pages_are_not_cached(client, posts):
+    posts('Скворцы', 'Весна пришла')
+    response = client.get('/search/', {'q': 'скворцы'})
+    assert response.status_code == HTTPStatus.OK
+    assert not response.has_header('X-Page-Cache')
+
+
+def test_index_follows_updates_and_deletes(posts):
+    post = posts('Скворцы', 'Весна пришла')
+    post.title = 'Грачи'
+    post.save()
+    assert list(search(Post.objects.all(), 'грачи')) == [post]
+    assert not search(Post.objects.all(), 'скворцы')
+    Post.objects.filter(pk=post.pk).update(text='Прилетели ласточки')
+    assert list(search(Post.objects.all(), 'ласточки')) == [post]
+    post.delete()
+    assert not search(Post.objects.all(), 'грачи')
+
+
+def test_admin_search_uses_index(rf, posts):
+    post = posts('Скворцы', 'Весна пришла')
+    posts('Грачи', 'Прилетели')
+    admin = site._registry[Post]
+    queryset, may_have_duplicates = admin.get_search_results(
+        rf.get('/'), Post.objects.all(), 'скворцы весна'
+    )
+    assert list(queryset) == [post]
+    assert not may_have_duplicates
+    assert 'blog_post_fts' in str(queryset.query)
+
+
+def test_comment_admin_searches_text_and_author_prefix(
+        rf, mixer, user, another_user, post_with_published_location):
+    post = post_with_published_location
+    user.username, another_user.username = 'ivan_petrov', 'anna'
+    user.save()
+    another_user.save()
+    wanted = mixer.blend(
+        'blog.Comment', post=post, author=user, text='Скворцы прилетели'
+    )
+    mixer.blend(
+        'blog.Comment', post=post, author=another_user,
+        text='Скворцы улетели',
+    )
+    admin = site._registry[Comment]
+    queryset, may_have_duplicates = admin.get_search_results(
+        rf.get('/'), Comment.objects.all(), '@ivan скворц*'
+    )
+    assert list(queryset) == [wanted]
+    assert not may_have_duplicates
+    sql = str(queryset.query)
+    assert 'blog_comment_fts' in sql
+    assert 'LIKE' not in sql
+
+
+@override_settings(ADMIN_SEARCH_LIMIT=2)
+def test_author_search_finds_matches_past_the_limit(
+        rf, mixer, user, another_user, post_with_published_location):
+    post = post_with_published_location
+    user.username, another_user.username = 'ivan', 'anna'
+    user.save()
+    another_user.save()
+    old = mixer.blend('blog.Comment', post=post, author=user, text='Скворцы')
+    mixer.cycle(3).blend(
+        'blog.Comment', post=post, author=another_user, text='Скворцы'
+    )
+    queryset, _ = site._registry[Comment].get_search_results(
+        rf.get('/'), Comment.objects.all(), '@ivan скворцы'
+    )
+    assert list(queryset) == [old]
+
+
+def test_comment_changelist_does_not_enumerate_texts(
+        admin_client, mixer, post_with_published_location):
+    mixer.cycle(3).blend('blog.Comment', post=post_with_published_location)
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(
+            '/admin/blog/comment/', {'q': '@admin'}
+        )
+    assert response.status_code == HTTPStatus.OK
+    for query in queries.captured_queries:
+        assert 'DISTINCT' not in query['sql']
+        assert 'LIKE' not in query['sql']
@@ -0,0 +1,36 @@
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize('pragma, expected', (
+    ('busy_timeout', settings.SQLITE_PRAGMAS['busy_timeout']),
+    ('cache_size', settings.SQLITE_PRAGMAS['cache_size']),
+    ('synchronous', 1),
+    ('temp_store', 2),
+))
+def test_connection_uses_profile(pragma, expected):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {pragma}')
+        assert cursor.fetchone()[0] == expected
+
+
+def test_file_database_uses_wal_and_mmap(tmp_path):
+    # Тестовая база в памяти не поддерживает WAL и mmap.
+    database = DatabaseWrapper(
+        {**connection.settings_dict, 'NAME': str(tmp_path / 'db.sqlite3')},
+        alias='profile',
+    )
+    try:
+        with database.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            assert cursor.fetchone()[0] == 'wal'
+            cursor.execute('PRAGMA mmap_size')
+            assert cursor.fetchone()[0] == (
+                settings.SQLITE_PRAGMAS['mmap_size']
+            )
+    finally:
+        database.close()
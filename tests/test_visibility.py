@@ -0,0 +1,55 @@
+import pytest
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Category, Post
+from core.services import filter_publication
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_feed_query_does_not_join_category(published_category):
+    with CaptureQueriesContext(connection) as queries:
+        list(filter_publication(Post.objects.all()))
+    sql = queries.captured_queries[-1]['sql']
+    assert '"blog_post"."is_visible"' in sql
+    assert 'blog_category' not in sql
+
+
+def test_category_toggle_updates_posts(
+        user_client, mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+    )
+    assert Post.objects.get(pk=post.pk).is_visible
+    published_category.is_published = False
+    published_category.save()
+    assert not Post.objects.get(pk=post.pk).is_visible
+    assert post not in user_client.get('/').context['page_obj']
+
+
+def test_admin_actions_publish_categories(
+        rf, mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+    )
+    admin = site._registry[Category]
+    queryset = Category.objects.filter(pk=published_category.pk)
+    with CaptureQueriesContext(connection) as queries:
+        admin.unpublish(rf.get('/'), queryset)
+    assert not any(
+        query['sql'].startswith('UPDATE "blog_post" SET "title"')
+        for query in queries.captured_queries
+    )
+    assert not Post.objects.get(pk=post.pk).is_visible
+    admin.publish(rf.get('/'), queryset)
+    assert Post.objects.get(pk=post.pk).is_visible
+
+
+def test_deleted_category_hides_posts(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+    )
+    published_category.delete()
+    assert not Post.objects.get(pk=post.pk).is_visible